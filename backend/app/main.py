@@ -3,19 +3,20 @@ La Consulta Backend API
 Main application entry point with all routers configured
 """
 import os
+import re
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from .config import settings
 from .routers import auth, documents, extractions, annotations, ai, pdf_library
-from .models import User, db
-from .auth import get_password_hash
-from datetime import datetime, timezone
 
 
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
-    description="Backend API for La Consulta Clinical Extractor - Secure AI proxy and data management"
+    description="Backend API for La Consulta Clinical Extractor - Secure AI proxy and data management",
+    # orjson serializes straight to bytes - matters for multi-MB pdf_data payloads
+    default_response_class=ORJSONResponse
 )
 
 # Auto-create demo user on startup (zero-configuration UX)
@@ -24,9 +25,9 @@ async def startup_event():
     """Create a demo user and initialize PDF library on startup"""
     from datetime import datetime, timezone
     import bcrypt
-    import base64
     from pathlib import Path
-    from .models import User, PDFLibraryItem, db
+    from .models import User, PDFLibraryItem, PDFLibraryItemResponse, db
+    from .pdf_encoding import pdf_file_etag, preload_pdf
 
     # Create demo user
     demo_email = "demo@example.com"
@@ -78,61 +79,70 @@ async def startup_event():
             pdf_path = public_folder / pdf_info["filename"]
             
             if pdf_path.exists():
-                with open(pdf_path, "rb") as f:
-                    pdf_data = base64.b64encode(f.read()).decode('utf-8')
-                    pdf_data_with_prefix = f"data:application/pdf;base64,{pdf_data}"
-
+                # PDF data is encoded lazily by the library endpoint; warm the
+                # page cache now so the first request does not hit cold disk
+                preload_pdf(pdf_path)
                 library_item = PDFLibraryItem(
                     id=pdf_info["id"],
                     title=pdf_info["title"],
                     filename=pdf_info["filename"],
-                    pdf_data=pdf_data_with_prefix,
+                    pdf_path=str(pdf_path),
+                    etag=pdf_file_etag(pdf_path),
                     total_pages=pdf_info["total_pages"],
                     description=pdf_info.get("description"),
                     created_at=now
                 )
 
                 db.pdf_library[library_item.id] = library_item
+                db.pdf_library_responses[library_item.id] = PDFLibraryItemResponse.from_item(library_item)
             else:
                 print(f"⚠️ PDF not found: {pdf_path}")
 
         print(f"✅ Initialized PDF library with {len(db.pdf_library)} items")
 
 
-# Parse CORS origins from environment variable
-cors_origins_env = os.getenv("CORS_ORIGINS", "")
-allowed_origins = []
-if cors_origins_env:
-    if cors_origins_env == "*":
-        allowed_origins = ["*"]
-    else:
-        allowed_origins.extend([origin.strip() for origin in cors_origins_env.split(",") if origin.strip()])
+# Replit dev preview origins, e.g. https://<id>-00-<slug>.<cluster>.replit.dev.
+# Compiled once at import; CORSMiddleware fullmatches it against each Origin.
+REPLIT_DEV_ORIGIN_REGEX = re.compile(r"^https://([a-z0-9-]+\.)+replit\.dev$")
+
 
-# Get current Replit URL if running on Replit
-replit_url = None
-if os.getenv('REPL_SLUG') and os.getenv('REPL_OWNER'):
-    replit_url = f"https://{os.getenv('REPL_SLUG')}.{os.getenv('REPL_OWNER')}.repl.co"
+def cors_middleware_options(cors_origins_env: str) -> dict:
+    """
+    Build CORSMiddleware options from the CORS_ORIGINS environment value
 
-allowed_origins.extend([
-    "http://localhost:5173",
-    "http://localhost:5000",
-    "http://127.0.0.1:5173",
-    "http://127.0.0.1:5000",
-])
+    CORS_ORIGINS is a comma-separated origin list. "*" allows Replit dev
+    preview origins through REPLIT_DEV_ORIGIN_REGEX rather than every
+    origin, since credentials are allowed and Starlette skips the regex
+    whenever "*" is in allow_origins.
+    """
+    allowed_origins = set()
+    if cors_origins_env and cors_origins_env != "*":
+        allowed_origins.update(origin.strip() for origin in cors_origins_env.split(",") if origin.strip())
 
-if replit_url:
-    allowed_origins.append(replit_url)
+    allowed_origins.update([
+        "http://localhost:5173",
+        "http://localhost:5000",
+        "http://127.0.0.1:5173",
+        "http://127.0.0.1:5000",
+    ])
+
+    # Get current Replit URL if running on Replit
+    if os.getenv('REPL_SLUG') and os.getenv('REPL_OWNER'):
+        allowed_origins.add(f"https://{os.getenv('REPL_SLUG')}.{os.getenv('REPL_OWNER')}.repl.co")
+
+    # Starlette checks `origin in allow_origins` per request, so a
+    # frozenset makes that an O(1) lookup.
+    return {
+        "allow_origins": frozenset(allowed_origins),
+        "allow_credentials": True,
+        "allow_methods": ["*"],
+        "allow_headers": ["*"],
+        "allow_origin_regex": REPLIT_DEV_ORIGIN_REGEX if cors_origins_env == "*" else None,
+    }
 
 
 # Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=allowed_origins if allowed_origins != ["*"] else ["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-    allow_origin_regex=r"https://.*\.replit\.dev" if cors_origins_env == "*" else None,
-)
+app.add_middleware(CORSMiddleware, **cors_middleware_options(os.getenv("CORS_ORIGINS", "")))
 
 app.include_router(auth.router)
 app.include_router(documents.router)
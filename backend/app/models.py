@@ -3,7 +3,7 @@ In-memory database models for the application
 """
 from datetime import datetime
 from typing import Dict, List, Optional, Any
-from pydantic import BaseModel, EmailStr, validator
+from pydantic import BaseModel, ConfigDict, EmailStr, validator, model_validator
 import uuid
 
 
@@ -315,23 +315,41 @@ class QueryWithCitationsResponse(BaseModel):
 
 class PDFLibraryItem(BaseModel):
     """PDF Library Item - Fixed set of PDFs available to all users"""
+    model_config = ConfigDict(frozen=True, extra='forbid')
+
     id: str
     title: str
     filename: str
-    pdf_data: str  # Base64 encoded PDF data
+    pdf_bytes: Optional[bytes] = None  # Raw PDF bytes (uploaded items)
+    pdf_path: Optional[str] = None  # File on disk, encoded on demand (bundled items)
+    etag: Optional[str] = None  # Content validator for conditional GETs
     total_pages: int
     description: Optional[str] = None
     created_at: datetime
 
+    @model_validator(mode="after")
+    def validate_pdf_source(self):
+        """Require exactly one of pdf_bytes or pdf_path"""
+        if (self.pdf_bytes is None) == (self.pdf_path is None):
+            raise ValueError('Exactly one of pdf_bytes or pdf_path must be set')
+        return self
+
 
 class PDFLibraryItemResponse(BaseModel):
     """PDF Library Item response (without PDF data for listing)"""
+    model_config = ConfigDict(frozen=True)
+
     id: str
     title: str
     filename: str
     total_pages: int
     description: Optional[str] = None
 
+    @classmethod
+    def from_item(cls, item: PDFLibraryItem) -> "PDFLibraryItemResponse":
+        """Listing entry for a library item, built once when the item is added"""
+        return cls.model_validate(item, from_attributes=True)
+
 
 class PDFLibraryItemDetail(BaseModel):
     """PDF Library Item detail (with PDF data)"""
@@ -352,6 +370,7 @@ class InMemoryDatabase:
         self.extractions: Dict[str, Extraction] = {}
         self.annotations: Dict[str, Annotation] = {}
         self.pdf_library: Dict[str, PDFLibraryItem] = {}  # Fixed library of PDFs
+        self.pdf_library_responses: Dict[str, PDFLibraryItemResponse] = {}  # library_id -> prebuilt listing entry
         
         self.users_by_email: Dict[str, str] = {}  # email -> user_id
         self.documents_by_user: Dict[str, List[str]] = {}  # user_id -> [document_ids]
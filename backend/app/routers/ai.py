@@ -3,6 +3,7 @@ AI proxy endpoints - Securely proxy AI API calls with fallback support
 This is the critical security fix: API keys are now server-side only
 Supports Gemini (primary) with Anthropic Claude fallback
 """
+import asyncio
 import json
 from fastapi import APIRouter, HTTPException, status, Depends
 from ..models import (
@@ -56,7 +57,8 @@ Extract the following in JSON format:
 
 Return ONLY valid JSON, no additional text."""
 
-        response_text = generate_text(
+        response_text = await asyncio.to_thread(
+            generate_text,
             prompt=prompt,
             require_json=True,
             temperature=0.2,
@@ -90,7 +92,8 @@ Provide a clear, concise summary focusing on:
 2. Main findings and results
 3. Clinical implications"""
 
-        response_text = generate_text(
+        response_text = await asyncio.to_thread(
+            generate_text,
             prompt=prompt,
             require_json=False,
             temperature=0.3,
@@ -127,7 +130,8 @@ Return JSON:
     "confidence": 0.0-1.0
 }}"""
 
-        response_text = generate_text(
+        response_text = await asyncio.to_thread(
+            generate_text,
             prompt=prompt,
             require_json=True,
             temperature=0.2,
@@ -166,7 +170,8 @@ Return JSON:
 
 Return null for fields not found."""
 
-        response_text = generate_text(
+        response_text = await asyncio.to_thread(
+            generate_text,
             prompt=prompt,
             require_json=True,
             temperature=0.1,
@@ -206,7 +211,8 @@ Return JSON array:
     ]
 }}"""
 
-        response_text = generate_text(
+        response_text = await asyncio.to_thread(
+            generate_text,
             prompt=prompt,
             require_json=True,
             temperature=0.2,
@@ -230,7 +236,8 @@ async def analyze_image(request: ImageAnalysisRequest, current_user: User = Depe
     rate_limiter.check_rate_limit(f"ai:{current_user.id}", settings.AI_RATE_LIMIT_PER_MINUTE)
     
     try:
-        response_text = generate_text(
+        response_text = await asyncio.to_thread(
+            generate_text,
             prompt=request.prompt,
             require_json=False,
             temperature=0.3,
@@ -258,7 +265,8 @@ async def deep_analysis(request: DeepAnalysisRequest, current_user: User = Depen
 DOCUMENT TEXT:
 {request.pdf_text[:15000]}"""
 
-        response_text = generate_text(
+        response_text = await asyncio.to_thread(
+            generate_text,
             prompt=prompt,
             require_json=False,
             temperature=0.3,
@@ -3,47 +3,144 @@
 PDF Library management endpoints
 Fixed library of PDFs available to all users
 """
-from typing import List
-from fastapi import APIRouter, HTTPException, status, Depends
+import asyncio
+import orjson
+from functools import lru_cache
+from typing import List, Optional
+from urllib.parse import quote
+from fastapi import APIRouter, HTTPException, status, Depends, File, Form, Request, UploadFile
+from fastapi.responses import FileResponse, Response
 from datetime import datetime, timezone
 from ..models import (
     User, PDFLibraryItem, PDFLibraryItemResponse, PDFLibraryItemDetail, db
 )
 from ..auth import get_current_user
-from pydantic import BaseModel
+from ..pdf_encoding import (
+    encode_pdf_data_uri, encode_pdf_bytes_data_uri, pdf_bytes_etag, pdf_file_etag
+)
 
 router = APIRouter(prefix="/api/pdf-library", tags=["pdf-library"])
 
 
-class PDFLibraryUploadRequest(BaseModel):
-    """Request to add a PDF to the library"""
-    title: str
-    filename: str
-    pdf_data: str  # Base64 encoded with data:application/pdf;base64, prefix
-    total_pages: int
-    description: str = None
+# Every PDF file starts with this header
+PDF_MAGIC = b"%PDF-"
+
+
+# Library content only changes by adding or deleting items, so clients may
+# reuse a response for an hour and revalidate it cheaply with If-None-Match
+CACHE_CONTROL = "private, max-age=3600"
+
+
+@lru_cache(maxsize=16)
+def _load_pdf_data_uri(pdf_path: str, etag: str) -> str:
+    """
+    Encode a bundled library PDF, keeping the most recently used ones resident
+
+    Keyed on the file's current ETag as well as its path, so a PDF replaced
+    on disk is re-encoded instead of served stale from the cache.
+    """
+    return encode_pdf_data_uri(pdf_path)
+
+
+def _current_etag(item: PDFLibraryItem) -> Optional[str]:
+    """ETag of the item's content as it is now; bundled files are re-stat'ed"""
+    if item.pdf_path is not None:
+        return pdf_file_etag(item.pdf_path)
+    return item.etag
+
+
+def _cache_headers(etag: Optional[str]) -> dict:
+    """ETag and Cache-Control headers for a library PDF response"""
+    if etag is None:
+        return {}
+    return {"ETag": f'"{etag}"', "Cache-Control": CACHE_CONTROL}
+
+
+def _is_not_modified(request: Request, etag: Optional[str]) -> bool:
+    """Whether the client's If-None-Match already matches the given ETag"""
+    if_none_match = request.headers.get("if-none-match")
+    if etag is None or if_none_match is None:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return f'"{etag}"' in tags
+
+
+# Serialized library listing, rebuilt only after the library changes (upload/delete)
+_list_cache: Optional[bytes] = None
+
+
+def _invalidate_list_cache() -> None:
+    """Drop the cached listing so the next GET rebuilds it"""
+    global _list_cache
+    _list_cache = None
 
 
 @router.get("", response_model=List[PDFLibraryItemResponse])
 async def list_library_pdfs(current_user: User = Depends(get_current_user)):
-    """List all PDFs in the library (without PDF data)"""
-    items = list(db.pdf_library.values())
+    """
+    List all PDFs in the library (without PDF data)
     
-    return [
-        PDFLibraryItemResponse(
-            id=item.id,
-            title=item.title,
+    Returns the cached JSON body directly; FastAPI skips response_model
+    validation for Response objects, which keeps the schema in the docs only.
+    """
+    global _list_cache
+    if _list_cache is None:
+        _list_cache = orjson.dumps(
+            [entry.model_dump() for entry in db.pdf_library_responses.values()]
+        )
+    
+    return Response(content=_list_cache, media_type="application/json")
+
+
+@router.get("/{library_id}/raw")
+async def get_library_pdf_raw(
+    library_id: str,
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    """Get specific PDF from library as binary application/pdf"""
+    item = db.pdf_library.get(library_id)
+    
+    if not item:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="PDF not found in library"
+        )
+    
+    etag = _current_etag(item)
+    headers = _cache_headers(etag)
+    if _is_not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    if item.pdf_path is not None:
+        return FileResponse(
+            item.pdf_path,
+            media_type="application/pdf",
             filename=item.filename,
-            total_pages=item.total_pages,
-            description=item.description
+            content_disposition_type="inline",
+            headers=headers
         )
-        for item in items
-    ]
+    
+    headers["Content-Disposition"] = f"inline; filename*=utf-8''{quote(item.filename)}"
+    return Response(content=item.pdf_bytes, media_type="application/pdf", headers=headers)
 
 
-@router.get("/{library_id}", response_model=PDFLibraryItemDetail)
-async def get_library_pdf(library_id: str, current_user: User = Depends(get_current_user)):
-    """Get specific PDF from library with full data"""
+@router.get("/{library_id}", response_model=PDFLibraryItemDetail, deprecated=True)
+async def get_library_pdf(
+    library_id: str,
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get specific PDF from library with full data
+    
+    Deprecated: returns the PDF as a base64 data URI. Use
+    GET /api/pdf-library/{library_id}/raw for the binary file instead.
+    """
     item = db.pdf_library.get(library_id)
     
     if not item:
@@ -52,11 +149,23 @@ async def get_library_pdf(library_id: str, current_user: User = Depends(get_curr
             detail="PDF not found in library"
         )
     
+    etag = _current_etag(item)
+    headers = _cache_headers(etag)
+    if _is_not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    
+    # The data URI is only built here, at serialization time
+    if item.pdf_path is not None:
+        pdf_data = await asyncio.to_thread(_load_pdf_data_uri, item.pdf_path, etag)
+    else:
+        pdf_data = await asyncio.to_thread(encode_pdf_bytes_data_uri, item.pdf_bytes)
+    
     return PDFLibraryItemDetail(
         id=item.id,
         title=item.title,
         filename=item.filename,
-        pdf_data=item.pdf_data,
+        pdf_data=pdf_data,
         total_pages=item.total_pages,
         description=item.description
     )
@@ -64,50 +173,58 @@ async def get_library_pdf(library_id: str, current_user: User = Depends(get_curr
 
 @router.post("/upload", response_model=PDFLibraryItemResponse)
 async def upload_pdf_to_library(
-    request: PDFLibraryUploadRequest,
+    file: UploadFile = File(...),
+    title: str = Form(...),
+    total_pages: int = Form(...),
+    description: Optional[str] = Form(None),
     current_user: User = Depends(get_current_user)
 ):
     """
     Admin endpoint: Upload a new PDF to the library
     
     This allows you to add PDFs dynamically without restarting the backend.
-    The PDF data should be base64-encoded with the data URI prefix:
-    data:application/pdf;base64,<base64_data>
+    Send multipart/form-data with the raw PDF as the `file` part plus
+    `title`, `total_pages` and optional `description` fields.
     """
     # Generate unique ID
     library_id = f"library_{db.generate_id()}"
     
-    # Validate PDF data format
-    if not request.pdf_data.startswith("data:application/pdf;base64,"):
+    # Validate PDF header before reading the whole upload
+    if await file.read(len(PDF_MAGIC)) != PDF_MAGIC:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="PDF data must be base64-encoded with data URI prefix"
+            detail="Uploaded file is not a PDF"
         )
     
+    await file.seek(0)
+    pdf_bytes = await file.read()
+    
+    etag = await asyncio.to_thread(pdf_bytes_etag, pdf_bytes)
+    
     # Create library item
     now = datetime.now(timezone.utc)
     library_item = PDFLibraryItem(
         id=library_id,
-        title=request.title,
-        filename=request.filename,
-        pdf_data=request.pdf_data,
-        total_pages=request.total_pages,
-        description=request.description,
+        title=title,
+        filename=file.filename or f"{library_id}.pdf",
+        pdf_bytes=pdf_bytes,
+        etag=etag,
+        total_pages=total_pages,
+        description=description,
         created_at=now
     )
     
+    # Listing entry is built once here and reused by every list request
+    library_response = PDFLibraryItemResponse.from_item(library_item)
+    
     # Add to library
     db.pdf_library[library_id] = library_item
+    db.pdf_library_responses[library_id] = library_response
+    _invalidate_list_cache()
     
-    print(f"✅ Added new PDF to library: {request.title} (ID: {library_id})")
+    print(f"✅ Added new PDF to library: {title} (ID: {library_id})")
     
-    return PDFLibraryItemResponse(
-        id=library_item.id,
-        title=library_item.title,
-        filename=library_item.filename,
-        total_pages=library_item.total_pages,
-        description=library_item.description
-    )
+    return library_response
 
 
 @router.delete("/{library_id}")
@@ -125,6 +242,8 @@ async def delete_library_pdf(
         )
     
     deleted_item = db.pdf_library.pop(library_id)
+    db.pdf_library_responses.pop(library_id, None)
+    _invalidate_list_cache()
     print(f"✅ Deleted PDF from library: {deleted_item.title} (ID: {library_id})")
     
     return {"message": f"Deleted {deleted_item.title} from library"}
@@ -3,44 +3,63 @@ Gemini File Search Service
 Handles PDF uploads to File Search stores and querying with citations
 
 Note: This service requires the newer google-genai SDK for File Search API.
-Falls back gracefully if not available.
+Falls back gracefully if not available. The SDK is imported on first use,
+so app startup does not pay for it when File Search is never called.
 """
-import base64
 import asyncio
+import io
 import json
 from typing import Optional, Dict, Any, List
 from ..config import settings
+from ..pdf_encoding import decode_pdf_base64
 
-# Try to import the newer google-genai SDK for File Search
-try:
-    from google import genai
-    from google.genai import types
-    HAS_FILE_SEARCH = True
-except ImportError:
-    # Fall back to google-generativeai which doesn't have File Search
-    import google.generativeai as genai
-    HAS_FILE_SEARCH = False
+# google-genai SDK modules, populated by _load_genai() on first use
+genai = None
+types = None
+
+
+def _load_genai() -> bool:
+    """Import the google-genai SDK if needed; False when it is not installed"""
+    global genai, types
+    if genai is None:
+        try:
+            from google import genai as genai_module
+            from google.genai import types as types_module
+        except ImportError:
+            return False
+        genai, types = genai_module, types_module
+    return True
 
 
 class FileSearchService:
     """Service for managing Gemini File Search operations"""
 
     def __init__(self):
-        """Initialize the File Search service with Gemini client"""
-        global HAS_FILE_SEARCH
+        """Initialize the File Search service; the Gemini client is created on first use"""
         self.store_mappings: Dict[str, str] = {}
-        self.client = None
-
-        if HAS_FILE_SEARCH:
-            try:
-                self.client = genai.Client(api_key=settings.GEMINI_API_KEY)
-                print("✅ File Search API initialized successfully")
-            except Exception as e:
-                print(f"Warning: Could not initialize File Search client: {e}")
-                HAS_FILE_SEARCH = False
-
-        if not HAS_FILE_SEARCH:
-            print("Note: File Search API not available. Citation features will be limited.")
+        self._client = None
+        self._client_initialized = False
+
+    @property
+    def client(self):
+        """Gemini File Search client, or None if the API is not available"""
+        if not self._client_initialized:
+            self._client_initialized = True
+            if _load_genai():
+                try:
+                    self._client = genai.Client(api_key=settings.GEMINI_API_KEY)
+                    print("✅ File Search API initialized successfully")
+                except Exception as e:
+                    print(f"Warning: Could not initialize File Search client: {e}")
+
+            if self._client is None:
+                print("Note: File Search API not available. Citation features will be limited.")
+        return self._client
+
+    @client.setter
+    def client(self, value):
+        self._client = value
+        self._client_initialized = True
     
     async def upload_pdf_to_file_search(self, document_id: str, pdf_base64: str, filename: str) -> Dict[str, str]:
         """
@@ -58,40 +77,32 @@ class FileSearchService:
             raise Exception("File Search API not available. Install google-genai package for this feature.")
 
         try:
-            # Decode base64 PDF data
-            pdf_data = base64.b64decode(
-                pdf_base64.split(',')[1] if ',' in pdf_base64 else pdf_base64
-            )
-            
-            # Create a temporary file to upload
-            import tempfile
-            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp_file:
-                tmp_file.write(pdf_data)
-                tmp_file_path = tmp_file.name
+            # Decode base64 PDF data off the event loop
+            pdf_data = await asyncio.to_thread(decode_pdf_base64, pdf_base64)
             
             # Create File Search Store with display name
             file_search_store = self.client.file_search_stores.create(
                 config={'display_name': f'clinical_doc_{document_id}'}
             )
             
-            # Upload PDF directly to the File Search store
+            # Upload the decoded bytes straight from memory - no temp file
+            # to write, re-read or leak. BytesIO needs an explicit mime_type.
             operation = self.client.file_search_stores.upload_to_file_search_store(
-                file=tmp_file_path,
+                file=io.BytesIO(pdf_data),
                 file_search_store_name=file_search_store.name,
-                config={'display_name': filename}
+                config={'display_name': filename, 'mime_type': 'application/pdf'}
             )
             
-            # Wait for import to complete (up to 60 seconds)
+            # Wait for import to complete (up to 60 seconds), polling with
+            # exponential backoff so quick imports are not held for a full 5s
             max_wait = 60
-            elapsed = 0
+            elapsed = 0.0
+            delay = 0.2
             while not operation.done and elapsed < max_wait:
-                await asyncio.sleep(5)
+                await asyncio.sleep(delay)
                 operation = self.client.operations.get(operation)
-                elapsed += 5
-            
-            # Clean up temp file
-            import os
-            os.unlink(tmp_file_path)
+                elapsed += delay
+                delay = min(5.0, delay * 1.5)
             
             if not operation.done:
                 raise Exception("File upload timed out after 60 seconds")
@@ -146,37 +157,33 @@ class FileSearchService:
             # Extract answer text
             answer = response.text if response.text else "No answer generated"
             
-            # Parse citations from grounding metadata
+            # Parse citations from grounding metadata. Each attribute is looked
+            # up once and bound to a local; missing or None values are skipped.
             citations = []
-            if hasattr(response, 'candidates') and response.candidates:
-                candidate = response.candidates[0]
-                if hasattr(candidate, 'grounding_metadata') and candidate.grounding_metadata:
-                    metadata = candidate.grounding_metadata
+            candidates = getattr(response, 'candidates', None)
+            metadata = getattr(candidates[0], 'grounding_metadata', None) if candidates else None
+            
+            if metadata is not None:
+                supports = getattr(metadata, 'grounding_supports', None) or ()
+                chunks = getattr(metadata, 'grounding_chunks', None) or ()
+                
+                for support in supports:
+                    # Get cited text and location
+                    segment = getattr(support, 'segment', None)
+                    if segment is None:
+                        continue
+                    
+                    # Page number comes from the first grounding chunk, if any
+                    page_num = None
+                    chunk_indices = getattr(support, 'grounding_chunk_indices', None)
+                    if chunk_indices and chunk_indices[0] < len(chunks):
+                        page_num = getattr(chunks[chunk_indices[0]], 'page_number', None)
                     
-                    # Extract grounding supports (citations)
-                    if hasattr(metadata, 'grounding_supports'):
-                        for support in metadata.grounding_supports:
-                            # Get cited text and location
-                            if hasattr(support, 'segment'):
-                                segment = support.segment
-                                cited_text = segment.text if hasattr(segment, 'text') else ""
-                                
-                                # Try to extract page number from chunks
-                                page_num = None
-                                if hasattr(support, 'grounding_chunk_indices') and support.grounding_chunk_indices:
-                                    # Get the first chunk index
-                                    chunk_idx = support.grounding_chunk_indices[0]
-                                    if hasattr(metadata, 'grounding_chunks') and chunk_idx < len(metadata.grounding_chunks):
-                                        chunk = metadata.grounding_chunks[chunk_idx]
-                                        # Extract page number if available
-                                        if hasattr(chunk, 'page_number'):
-                                            page_num = chunk.page_number
-                                
-                                citations.append({
-                                    "text": cited_text,
-                                    "page_number": page_num,
-                                    "confidence": 0.95  # Default confidence
-                                })
+                    citations.append({
+                        "text": getattr(segment, 'text', None) or "",
+                        "page_number": page_num,
+                        "confidence": 0.95  # Default confidence
+                    })
             
             return {
                 "document_id": document_id,
@@ -12,6 +12,18 @@ from anthropic import Anthropic
 from ..config import settings
 
 
+def _strip_data_uri_prefix(value: str) -> str:
+    """
+    Return the payload of a data URI, or the value unchanged if it has none
+
+    Only data URIs are scanned for the comma, so bare base64 payloads are
+    not searched end to end.
+    """
+    if value.startswith("data:"):
+        return value.partition(",")[2]
+    return value
+
+
 class GeminiClient:
     """Client for Google Gemini API"""
     
@@ -54,9 +66,7 @@ class GeminiClient:
         temperature: float = 0.3
     ) -> str:
         """Generate response with image analysis"""
-        image_data = base64.b64decode(
-            image_base64.split(',')[1] if ',' in image_base64 else image_base64
-        )
+        image_data = base64.b64decode(_strip_data_uri_prefix(image_base64))
         
         response = self.model.generate_content([
             prompt,
@@ -108,7 +118,7 @@ class AnthropicClient:
         temperature: float = 0.3
     ) -> str:
         """Generate response with image analysis"""
-        image_data = image_base64.split(',')[1] if ',' in image_base64 else image_base64
+        image_data = _strip_data_uri_prefix(image_base64)
         
         messages = [{
             "role": "user",
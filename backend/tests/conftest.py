@@ -0,0 +1,88 @@
+"""
+Shared pytest fixtures for the backend test suite
+"""
+import sys
+import types
+import pytest
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models import db, User
+from app.auth import create_access_token
+from app.rate_limiter import rate_limiter
+
+
+@pytest.fixture(scope="session")
+def client():
+    """
+    FastAPI test client shared by the whole run
+
+    Entering it runs the startup events (demo user, bundled PDFs) once, before
+    any function-scoped fixture such as reset_db takes its snapshot.
+    """
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture(autouse=True)
+def reset_db():
+    """
+    Roll back users and rate-limit buckets around every test
+
+    Shared users therefore start each test with a full bucket, and users a
+    test registers (or forgets to remove) do not leak into the next one.
+    """
+    users_snapshot = db.users.copy()
+    emails_snapshot = db.users_by_email.copy()
+    rate_limiter.buckets.clear()
+    yield
+    db.users.clear()
+    db.users.update(users_snapshot)
+    db.users_by_email.clear()
+    db.users_by_email.update(emails_snapshot)
+    rate_limiter.buckets.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_app_caches():
+    """Clear every functools cache in the app package after each test"""
+    yield
+    for name, module in list(sys.modules.items()):
+        if module is None or not (name == "app" or name.startswith("app.")):
+            continue
+        for obj in vars(module).values():
+            if hasattr(obj, "cache_clear") and hasattr(obj, "cache_info"):
+                obj.cache_clear()
+
+
+@pytest.fixture(scope="session")
+def test_user():
+    """Create a test user (shared by the whole run)"""
+    user_id = db.users_by_email.setdefault("test@example.com", db.generate_id())
+    user = User(
+        id=user_id,
+        email="test@example.com",
+        password_hash="hashed_password",
+        created_at=datetime.now(),
+        updated_at=datetime.now()
+    )
+    db.users[user_id] = user
+    yield user
+    # Cleanup
+    if user_id in db.users:
+        del db.users[user_id]
+    if "test@example.com" in db.users_by_email:
+        del db.users_by_email["test@example.com"]
+
+
+@pytest.fixture(scope="session")
+def auth_headers(test_user):
+    """
+    Generate authentication headers, signed once and valid for the whole run
+
+    Read-only, since every test in the session shares the same mapping; merge
+    extra headers with {**auth_headers, ...}.
+    """
+    token = create_access_token(data={"sub": test_user.email}, expires_delta=timedelta(hours=2))
+    return types.MappingProxyType({"Authorization": f"Bearer {token}"})
@@ -7,18 +7,43 @@ These tests validate actual AI behavior and require:
 - Backend server running with LLM service configured
 - Network access to Google/Anthropic APIs
 
-Run with: pytest backend/tests/test_ai_real_llm.py -v -s
-Use -s to see real AI responses in console output
+Run with: pytest backend/tests/test_ai_real_llm.py -v
+Real AI responses are logged and shown for failing tests; add
+-o log_cli=true to stream them as the tests run
+Run the endpoint cases in parallel with: pytest backend/tests/test_ai_real_llm.py -n auto
+
+LLM responses can be recorded and replayed across runs (VCR-style):
+- LLM_CACHE_MODE=bypass (default): always call the real APIs
+- LLM_CACHE_MODE=record: replay cached responses, call and save on a miss
+- LLM_CACHE_MODE=replay: replay only; a cache miss fails the test
+Responses live in LLM_CACHE_DIR (default tests/.llm_cache); delete it to
+invalidate, or set LLM_CACHE_TTL (seconds) to expire entries by mtime.
 """
+import asyncio
+import hashlib
+import httpx
+import json
+import logging
+import orjson
 import pytest
+import pytest_asyncio
 import os
-from fastapi.testclient import TestClient
+import re
+import time
+from contextlib import contextmanager
+from fastapi.routing import APIRoute
+from tenacity import retry, retry_if_result, stop_after_attempt, wait_random_exponential
 from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
 
 from app.main import app
+from app.config import settings
 from app.models import db, User
 from app.auth import create_access_token
 
+log = logging.getLogger(__name__)
+
 
 # Skip all tests if no API key (allows CI/CD without keys)
 pytestmark = pytest.mark.skipif(
@@ -27,44 +52,25 @@ pytestmark = pytest.mark.skipif(
 )
 
 
-@pytest.fixture
-def client():
-    """FastAPI test client"""
-    return TestClient(app)
-
+LLM_CACHE_MODE = os.getenv("LLM_CACHE_MODE", "bypass")
+LLM_CACHE_DIR = Path(os.getenv("LLM_CACHE_DIR", Path(__file__).parent / ".llm_cache"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "inf"))
 
-@pytest.fixture
-def test_user():
-    """Create a test user for authentication"""
-    user_id = db.generate_id()
-    user = User(
-        id=user_id,
-        email="test_real_llm@example.com",
-        password_hash="hashed_password",
-        created_at=datetime.now(),
-        updated_at=datetime.now()
-    )
-    db.users[user_id] = user
-    db.users_by_email["test_real_llm@example.com"] = user_id
-    yield user
-    # Cleanup
-    if user_id in db.users:
-        del db.users[user_id]
-    if "test_real_llm@example.com" in db.users_by_email:
-        del db.users_by_email["test_real_llm@example.com"]
+if LLM_CACHE_MODE not in ("bypass", "record", "replay"):
+    raise ValueError(f"LLM_CACHE_MODE must be bypass, record or replay (got {LLM_CACHE_MODE!r})")
 
+# Fixed user timestamps; no test depends on when the user was created
+_NOW = datetime(2024, 1, 1)
 
-@pytest.fixture
-def auth_headers(test_user):
-    """Generate JWT authentication headers"""
-    token = create_access_token(data={"sub": test_user.email})
-    return {"Authorization": f"Bearer {token}"}
+# pytest-xdist workers each have their own in-memory db, so users cannot
+# collide across workers; the pid suffix only identifies the creating worker
+TEST_EMAIL = f"test_real_llm_{os.getpid()}@example.com"
 
+# Minimal valid PNG (1x1 red pixel)
+IMAGE_PNG_B64 = "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8z8DwHwAFBQIAX8jx0gAAAABJRU5ErkJggg=="
 
-@pytest.fixture
-def sample_clinical_text():
-    """Real clinical research paper excerpt for testing"""
-    return """
+# Real clinical research paper excerpt for testing
+SAMPLE_CLINICAL_TEXT = """
     Suboccipital Decompressive Craniectomy for Malignant Cerebellar Infarction
 
     ABSTRACT
@@ -89,358 +95,399 @@ def sample_clinical_text():
     Year: 2016
     """
 
+TEXT_WITH_TABLE = """
+        Table 1: Patient Outcomes by Treatment Group
 
-class TestRealLLM_GeneratePICO:
-    """Test PICO extraction with real Gemini API calls"""
-
-    def test_real_pico_extraction(self, client, auth_headers, sample_clinical_text):
-        """
-        Test PICO extraction using real Gemini API
-        Validates that the AI correctly identifies all 6 PICO-T fields
-        """
-        response = client.post(
-            "/api/ai/generate-pico",
-            json={"document_id": "test-doc-001", "pdf_text": sample_clinical_text},
-            headers=auth_headers,
-            timeout=60.0  # Real API calls need longer timeout
-        )
-
-        assert response.status_code == 200, f"Failed with: {response.json()}"
-        data = response.json()
-
-        # Validate all 6 PICO-T fields are present
-        required_fields = ["population", "intervention", "comparator", "outcomes", "timing", "study_type"]
-        for field in required_fields:
-            assert field in data, f"Missing field: {field}"
-            assert len(data[field]) > 0, f"Empty field: {field}"
-
-        # Validate semantic correctness of extracted data
-        print(f"\n✓ REAL PICO EXTRACTION RESULTS:")
-        print(f"  Population: {data['population']}")
-        print(f"  Intervention: {data['intervention']}")
-        print(f"  Comparator: {data['comparator']}")
-        print(f"  Outcomes: {data['outcomes']}")
-        print(f"  Timing: {data['timing']}")
-        print(f"  Study Type: {data['study_type']}")
-
-        # Semantic validation: check AI understood the content
-        assert "cerebellar" in data["population"].lower() or "infarction" in data["population"].lower()
-        assert "craniectomy" in data["intervention"].lower() or "SDC" in data["intervention"]
-        assert "mRS" in data["outcomes"] or "rankin" in data["outcomes"].lower()
-
-
-class TestRealLLM_GenerateSummary:
-    """Test summary generation with real Gemini API calls"""
+        | Outcome           | SDC Group (n=29) | BMT Alone (n=28) | P-value |
+        |-------------------|------------------|------------------|---------|
+        | mRS 0-2 at 12mo   | 16 (55%)         | 6 (21%)          | 0.006   |
+        | Mortality         | 5 (17%)          | 12 (43%)         | 0.04    |
+        | CSF Leak          | 3 (10%)          | 0 (0%)           | 0.08    |
 
-    def test_real_summary_generation(self, client, auth_headers, sample_clinical_text):
-        """
-        Test summary generation using real Gemini API
-        Validates quality and coherence of AI-generated summary
+        The results demonstrate significant benefit of surgical intervention.
         """
-        response = client.post(
-            "/api/ai/generate-summary",
-            json={"document_id": "test-doc-002", "pdf_text": sample_clinical_text},
-            headers=auth_headers,
-            timeout=60.0
-        )
-
-        assert response.status_code == 200
-        data = response.json()
 
-        assert "summary" in data
-        summary = data["summary"]
+# PICO request with 1.1MB of text (over the 1MB limit), prebuilt once as JSON bytes
+OVERSIZED_PICO_BODY = b'{"document_id":"test-large","pdf_text":"' + b"A" * 1_100_000 + b'"}'
 
-        # Quality validation
-        assert len(summary) >= 100, "Summary too short"
-        assert len(summary) <= 2000, "Summary too long (AI generated high-quality detailed summary)"
+# Terms the AI's answers are checked for, matched case-insensitively in one scan
+SUMMARY_CONCEPTS = re.compile(r"cerebellar|craniectomy|outcome|mortality", re.IGNORECASE)
+ANALYTICAL_TERMS = re.compile(r"strength|limitation|however|although|suggest|indicate", re.IGNORECASE)
 
-        print(f"\n✓ REAL SUMMARY GENERATION:")
-        print(f"  Length: {len(summary)} characters")
-        print(f"  Content: {summary[:200]}...")
 
-        # Semantic validation: summary should capture key points
-        summary_lower = summary.lower()
-        key_concepts = ["cerebellar", "craniectomy", "outcome", "mortality"]
-        matched_concepts = sum(1 for concept in key_concepts if concept in summary_lower)
-        assert matched_concepts >= 2, f"Summary missing key concepts (matched {matched_concepts}/4)"
-
-
-class TestRealLLM_ValidateField:
-    """Test field validation with real Gemini API calls"""
+@pytest.fixture(scope="module", autouse=True)
+def llm_cache():
+    """
+    Record/replay generate_text results according to LLM_CACHE_MODE
 
-    def test_real_validation_supported(self, client, auth_headers, sample_clinical_text):
-        """
-        Test field validation with a value that SHOULD be supported
-        Validates AI can verify factual claims
-        """
-        response = client.post(
-            "/api/ai/validate-field",
-            json={
-                "document_id": "test-doc-003",
-                "field_id": "sample_size",
-                "field_value": "57 patients",
-                "pdf_text": sample_clinical_text
-            },
-            headers=auth_headers,
-            timeout=60.0
-        )
+    Caches at the LLM call rather than the HTTP response, so auth, rate
+    limiting and response parsing still run for real on a replay. The key
+    covers the provider configuration and every generate_text argument,
+    which includes the request payload via the prompt.
+    """
+    if LLM_CACHE_MODE == "bypass":
+        yield
+        return
 
-        assert response.status_code == 200
-        data = response.json()
+    from app.routers import ai
+    real_generate_text = ai.generate_text
 
-        assert data["is_supported"] is True, "AI should confirm 57 patients is supported"
-        assert data["confidence"] > 0.7, "Confidence should be high for clear match"
-        assert "57" in data["quote"], "Quote should contain the validated number"
+    def cached_generate_text(**kwargs):
+        key_source = [settings.LLM_PRIMARY, settings.LLM_FALLBACK,
+                      settings.GEMINI_MODEL, settings.ANTHROPIC_MODEL, kwargs]
+        key = hashlib.sha256(json.dumps(key_source, sort_keys=True).encode()).hexdigest()
+        path = LLM_CACHE_DIR / f"{key}.json"
 
-        print(f"\n✓ REAL VALIDATION (Supported):")
-        print(f"  Is Supported: {data['is_supported']}")
-        print(f"  Confidence: {data['confidence']}")
-        print(f"  Quote: {data['quote']}")
+        if path.exists() and time.time() - path.stat().st_mtime < LLM_CACHE_TTL:
+            return json.loads(path.read_text())["response"]
+        if LLM_CACHE_MODE == "replay":
+            pytest.fail(f"No cached LLM response for {key} (LLM_CACHE_MODE=replay)")
 
-    def test_real_validation_not_supported(self, client, auth_headers, sample_clinical_text):
-        """
-        Test field validation with a value that should NOT be supported
-        Validates AI can reject incorrect claims
-        """
-        response = client.post(
-            "/api/ai/validate-field",
-            json={
-                "document_id": "test-doc-004",
-                "field_id": "sample_size",
-                "field_value": "500 patients",
-                "pdf_text": sample_clinical_text
-            },
-            headers=auth_headers,
-            timeout=60.0
-        )
+        # Only successful calls reach here; errors propagate and are not cached
+        response = real_generate_text(**kwargs)
+        LLM_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps({"request": kwargs, "response": response}))
+        tmp_path.replace(path)
+        return response
 
-        assert response.status_code == 200
-        data = response.json()
+    with patch("app.routers.ai.generate_text", side_effect=cached_generate_text):
+        yield
 
-        assert data["is_supported"] is False, "AI should reject incorrect patient count"
 
-        print(f"\n✓ REAL VALIDATION (Not Supported):")
-        print(f"  Is Supported: {data['is_supported']}")
-        print(f"  Confidence: {data['confidence']}")
+class _BoundedASGITransport(httpx.ASGITransport):
+    """ASGITransport that caps in-flight requests (httpx Limits only govern its own pool)"""
 
+    def __init__(self, *args, max_in_flight: int, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._semaphore = asyncio.Semaphore(max_in_flight)
 
-class TestRealLLM_FindMetadata:
-    """Test metadata extraction with real Gemini API calls"""
+    async def handle_async_request(self, request):
+        async with self._semaphore:
+            return await super().handle_async_request(request)
 
-    def test_real_metadata_extraction(self, client, auth_headers, sample_clinical_text):
-        """
-        Test metadata extraction using real Gemini API
-        Validates AI can identify DOI, PMID, journal, year
-        """
-        response = client.post(
-            "/api/ai/find-metadata",
-            json={"document_id": "test-doc-005", "pdf_text": sample_clinical_text},
-            headers=auth_headers,
-            timeout=60.0
-        )
 
-        assert response.status_code == 200
-        data = response.json()
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def aclient():
+    """Async client calling the app in-process, for concurrent requests (shared by the module)"""
+    async with httpx.AsyncClient(
+        transport=_BoundedASGITransport(app=app, max_in_flight=16),
+        base_url="http://test"
+    ) as c:
+        yield c
 
-        print(f"\n✓ REAL METADATA EXTRACTION:")
-        print(f"  DOI: {data.get('doi')}")
-        print(f"  PMID: {data.get('pmid')}")
-        print(f"  Journal: {data.get('journal')}")
-        print(f"  Year: {data.get('year')}")
 
-        # Validate at least some metadata was extracted
-        assert data.get("doi") or data.get("pmid") or data.get("journal"), "Should extract at least one metadata field"
-
-        # Semantic validation if DOI/PMID found
-        if data.get("doi"):
-            assert "10." in data["doi"], "DOI should start with 10."
-        if data.get("pmid"):
-            assert len(str(data["pmid"])) >= 7, "PMID should be 7-8 digits"
-
-
-class TestRealLLM_ExtractTables:
-    """Test table extraction with real Gemini API calls"""
+@contextmanager
+def _temp_user(email):
+    """
+    Register a user in the in-memory db, rolling the user tables back on exit
 
-    def test_real_table_extraction(self, client, auth_headers):
-        """
-        Test table extraction using real Gemini API
-        Uses text with clear tabular data
-        """
-        text_with_table = """
-        Table 1: Patient Outcomes by Treatment Group
+    Restores snapshots rather than deleting the one user, so any other users
+    registered while the block was active are removed too.
+    """
+    users_snapshot = db.users.copy()
+    emails_snapshot = db.users_by_email.copy()
+    user_id = db.generate_id()
+    user = User(
+        id=user_id,
+        email=email,
+        password_hash="hashed_password",
+        created_at=_NOW,
+        updated_at=_NOW
+    )
+    db.users[user_id] = user
+    db.users_by_email[email] = user_id
+    try:
+        yield user
+    finally:
+        db.users.clear()
+        db.users.update(users_snapshot)
+        db.users_by_email.clear()
+        db.users_by_email.update(emails_snapshot)
 
-        | Outcome           | SDC Group (n=29) | BMT Alone (n=28) | P-value |
-        |-------------------|------------------|------------------|---------|
-        | mRS 0-2 at 12mo   | 16 (55%)         | 6 (21%)          | 0.006   |
-        | Mortality         | 5 (17%)          | 12 (43%)         | 0.04    |
-        | CSF Leak          | 3 (10%)          | 0 (0%)           | 0.08    |
 
-        The results demonstrate significant benefit of surgical intervention.
-        """
+@pytest.fixture(scope="module")
+def test_user():
+    """Create a test user for authentication (shared by the whole module)"""
+    with _temp_user(TEST_EMAIL) as user:
+        yield user
 
-        response = client.post(
-            "/api/ai/extract-tables",
-            json={"document_id": "test-doc-006", "pdf_text": text_with_table},
-            headers=auth_headers,
-            timeout=60.0
-        )
 
-        assert response.status_code == 200
-        data = response.json()
+@pytest.fixture(scope="module")
+def auth_headers(test_user):
+    """Generate JWT authentication headers (signed once for the module)"""
+    token = create_access_token(data={"sub": test_user.email})
+    return {"Authorization": f"Bearer {token}"}
 
-        assert "tables" in data
-        tables = data["tables"]
 
-        print(f"\n✓ REAL TABLE EXTRACTION:")
-        print(f"  Tables Found: {len(tables)}")
-        if tables:
-            print(f"  First Table Title: {tables[0].get('title', 'N/A')}")
-            print(f"  Rows: {len(tables[0].get('data', []))}")
+@pytest.fixture(scope="session")
+def sample_clinical_text():
+    """Real clinical research paper excerpt for testing"""
+    return SAMPLE_CLINICAL_TEXT
 
-        # Validate table structure if any found
-        if len(tables) > 0:
-            table = tables[0]
-            assert "title" in table or "data" in table
-            if "data" in table:
-                assert len(table["data"]) > 0, "Table should have data rows"
 
+def _post_json(client, url, payload, headers=None, **kwargs):
+    """
+    POST a payload encoded with orjson instead of the client's stdlib json
 
-class TestRealLLM_AnalyzeImage:
-    """Test image analysis with real Gemini Vision API calls"""
+    Works with both TestClient and httpx.AsyncClient (returns a coroutine).
+    """
+    return client.post(
+        url,
+        content=orjson.dumps(payload),
+        headers={**(headers or {}), "Content-Type": "application/json"},
+        **kwargs
+    )
 
-    def test_real_image_analysis(self, client, auth_headers):
-        """
-        Test image analysis using real Gemini Vision API
-        Uses a minimal PNG image (1x1 pixel)
-        """
-        # Minimal valid PNG (1x1 red pixel)
-        image_base64 = "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8z8DwHwAFBQIAX8jx0gAAAABJRU5ErkJggg=="
 
-        response = client.post(
-            "/api/ai/analyze-image",
-            json={
-                "document_id": "test-doc-007",
-                "image_base64": image_base64,
-                "prompt": "Describe what you see in this image"
-            },
-            headers=auth_headers,
-            timeout=60.0
-        )
+# Upstream LLM failures (provider 429s, 5xx, timeouts) reach the client as the
+# AI routes' 500/502/503. The app's own rate-limit 429 is a real result and is
+# never retried.
+_TRANSIENT_STATUS = {500, 502, 503}
 
-        assert response.status_code == 200
-        data = response.json()
+_retry_transient = retry(
+    retry=retry_if_result(lambda response: response.status_code in _TRANSIENT_STATUS),
+    wait=wait_random_exponential(multiplier=1, max=30),
+    stop=stop_after_attempt(3),
+    # Hand the last response back so the test's assertion reports it
+    retry_error_callback=lambda retry_state: retry_state.outcome.result(),
+)
 
-        assert "analysis" in data
-        analysis = data["analysis"]
-        assert len(analysis) > 20, "Analysis should contain meaningful content"
 
-        print(f"\n✓ REAL IMAGE ANALYSIS:")
-        print(f"  Length: {len(analysis)} characters")
-        print(f"  Content: {analysis[:200]}...")
+@_retry_transient
+async def _apost_llm(aclient, url, payload, timeout, **kwargs):
+    """
+    _post_json to a real-LLM endpoint, retrying transient upstream failures with jittered backoff
 
+    Each attempt gets an asyncio deadline of timeout seconds, since httpx
+    timeouts are not enforced by ASGITransport. The deadline only stops the
+    await: the generate_text call keeps running in its worker thread, and
+    under LLM_CACHE_MODE=record a late successful answer is still cached.
+    """
+    return await asyncio.wait_for(_post_json(aclient, url, payload, **kwargs), timeout)
 
-class TestRealLLM_DeepAnalysis:
-    """Test deep analysis with real Gemini API calls"""
 
-    def test_real_deep_analysis(self, client, auth_headers, sample_clinical_text):
+def _assert_pico(data):
+    """All 6 PICO-T fields are present and reflect the sample paper"""
+    required_fields = ["population", "intervention", "comparator", "outcomes", "timing", "study_type"]
+    for field in required_fields:
+        assert field in data, f"Missing field: {field}"
+        assert len(data[field]) > 0, f"Empty field: {field}"
+
+    # Semantic validation: check AI understood the content
+    assert "cerebellar" in data["population"].lower() or "infarction" in data["population"].lower()
+    assert "craniectomy" in data["intervention"].lower() or "SDC" in data["intervention"]
+    assert "mRS" in data["outcomes"] or "rankin" in data["outcomes"].lower()
+
+
+def _assert_summary(data):
+    """Summary has a sensible length and captures key points"""
+    assert "summary" in data
+    summary = data["summary"]
+
+    # Quality validation
+    assert len(summary) >= 100, "Summary too short"
+    assert len(summary) <= 2000, "Summary too long (AI generated high-quality detailed summary)"
+
+    # Semantic validation: summary should capture key points
+    matched_concepts = len({match.lower() for match in SUMMARY_CONCEPTS.findall(summary)})
+    assert matched_concepts >= 2, f"Summary missing key concepts (matched {matched_concepts}/4)"
+
+
+def _assert_validation_supported(data):
+    """AI confirms a claim stated in the paper"""
+    assert data["is_supported"] is True, "AI should confirm 57 patients is supported"
+    assert data["confidence"] > 0.7, "Confidence should be high for clear match"
+    assert "57" in data["quote"], "Quote should contain the validated number"
+
+
+def _assert_validation_not_supported(data):
+    """AI rejects a claim contradicted by the paper"""
+    assert data["is_supported"] is False, "AI should reject incorrect patient count"
+
+
+def _assert_metadata(data):
+    """At least one bibliographic field is extracted and well-formed"""
+    assert data.get("doi") or data.get("pmid") or data.get("journal"), "Should extract at least one metadata field"
+
+    # Semantic validation if DOI/PMID found
+    if data.get("doi"):
+        assert "10." in data["doi"], "DOI should start with 10."
+    if data.get("pmid"):
+        assert len(str(data["pmid"])) >= 7, "PMID should be 7-8 digits"
+
+
+def _assert_tables(data):
+    """Extracted tables, if any, have a title or data rows"""
+    assert "tables" in data
+    tables = data["tables"]
+
+    # Validate table structure if any found
+    if len(tables) > 0:
+        table = tables[0]
+        assert "title" in table or "data" in table
+        if "data" in table:
+            assert len(table["data"]) > 0, "Table should have data rows"
+
+
+def _assert_image_analysis(data):
+    """Image analysis contains meaningful content"""
+    assert "analysis" in data
+    assert len(data["analysis"]) > 20, "Analysis should contain meaningful content"
+
+
+def _assert_deep_analysis(data):
+    """Deep analysis is comprehensive and uses critical evaluation language"""
+    assert "analysis" in data
+    analysis = data["analysis"]
+
+    # Quality validation
+    assert len(analysis) >= 150, "Deep analysis should be comprehensive"
+
+    # Semantic validation: should contain analytical language
+    assert ANALYTICAL_TERMS.search(analysis), "Analysis should contain critical evaluation language"
+
+
+# (endpoint, payload builder taking the sample text, response validator, timeout)
+ENDPOINT_CASES = [
+    pytest.param(
+        "/api/ai/generate-pico",
+        lambda text: {"document_id": "test-doc-001", "pdf_text": text},
+        _assert_pico, 60.0,
+        id="generate-pico"
+    ),
+    pytest.param(
+        "/api/ai/generate-summary",
+        lambda text: {"document_id": "test-doc-002", "pdf_text": text},
+        _assert_summary, 60.0,
+        id="generate-summary"
+    ),
+    pytest.param(
+        "/api/ai/validate-field",
+        lambda text: {"document_id": "test-doc-003", "field_id": "sample_size",
+                      "field_value": "57 patients", "pdf_text": text},
+        _assert_validation_supported, 60.0,
+        id="validate-field-supported"
+    ),
+    pytest.param(
+        "/api/ai/validate-field",
+        lambda text: {"document_id": "test-doc-004", "field_id": "sample_size",
+                      "field_value": "500 patients", "pdf_text": text},
+        _assert_validation_not_supported, 60.0,
+        id="validate-field-not-supported"
+    ),
+    pytest.param(
+        "/api/ai/find-metadata",
+        lambda text: {"document_id": "test-doc-005", "pdf_text": text},
+        _assert_metadata, 60.0,
+        id="find-metadata"
+    ),
+    pytest.param(
+        "/api/ai/extract-tables",
+        lambda text: {"document_id": "test-doc-006", "pdf_text": TEXT_WITH_TABLE},
+        _assert_tables, 60.0,
+        id="extract-tables"
+    ),
+    pytest.param(
+        "/api/ai/analyze-image",
+        lambda text: {"document_id": "test-doc-007", "image_base64": IMAGE_PNG_B64,
+                      "prompt": "Describe what you see in this image"},
+        _assert_image_analysis, 60.0,
+        id="analyze-image"
+    ),
+    pytest.param(
+        "/api/ai/deep-analysis",
+        lambda text: {"document_id": "test-doc-008", "pdf_text": text,
+                      "prompt": "Critically evaluate the study methodology, including strengths and limitations"},
+        _assert_deep_analysis, 90.0,  # Deep analysis needs more time
+        id="deep-analysis",
+        marks=pytest.mark.slow
+    ),
+]
+
+
+class TestRealLLM_Endpoints:
+    """Test each AI endpoint with real Gemini API calls"""
+
+    @pytest.mark.parametrize("endpoint,payload_fn,validator,timeout", ENDPOINT_CASES)
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_llm_endpoint(self, aclient, auth_headers, sample_clinical_text,
+                                endpoint, payload_fn, validator, timeout):
         """
-        Test deep analysis using real Gemini API
-        Validates AI can provide critical evaluation
+        Call one endpoint with the sample paper and validate the AI's answer
+        Validators check both response structure and that the content was understood
         """
-        response = client.post(
-            "/api/ai/deep-analysis",
-            json={
-                "document_id": "test-doc-008",
-                "pdf_text": sample_clinical_text,
-                "prompt": "Critically evaluate the study methodology, including strengths and limitations"
-            },
-            headers=auth_headers,
-            timeout=90.0  # Deep analysis needs more time
+        response = await _apost_llm(
+            aclient, endpoint, payload_fn(sample_clinical_text), timeout,
+            headers=auth_headers
         )
 
-        assert response.status_code == 200
-        data = response.json()
-
-        assert "analysis" in data
-        analysis = data["analysis"]
-
-        # Quality validation
-        assert len(analysis) >= 150, "Deep analysis should be comprehensive"
-
-        print(f"\n✓ REAL DEEP ANALYSIS:")
-        print(f"  Length: {len(analysis)} characters")
-        print(f"  Content: {analysis[:300]}...")
-
-        # Semantic validation: should contain analytical language
-        analysis_lower = analysis.lower()
-        analytical_terms = ["strength", "limitation", "however", "although", "suggest", "indicate"]
-        matched_terms = sum(1 for term in analytical_terms if term in analysis_lower)
-        assert matched_terms >= 1, "Analysis should contain critical evaluation language"
+        log.info("REAL %s (%d): %s", endpoint, response.status_code, response.text[:300])
+        assert response.status_code == 200, f"{endpoint} failed with: {response.text}"
+        validator(response.json())
 
 
 class TestRealLLM_Authentication:
     """Test authentication enforcement with real LLM endpoints"""
 
-    def test_all_endpoints_require_auth(self, client, sample_clinical_text):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_all_endpoints_require_auth(self, aclient):
         """
-        Verify all 7 AI endpoints reject unauthenticated requests
-        Ensures security even with real LLM calls
+        Verify every AI POST endpoint rejects unauthenticated requests
+        Routes are read from the app, so new endpoints are covered automatically
         """
         endpoints = [
-            ("/api/ai/generate-pico", {"document_id": "test", "pdf_text": sample_clinical_text}),
-            ("/api/ai/generate-summary", {"document_id": "test", "pdf_text": sample_clinical_text}),
-            ("/api/ai/validate-field", {"document_id": "test", "field_id": "test", "field_value": "test", "pdf_text": sample_clinical_text}),
-            ("/api/ai/find-metadata", {"document_id": "test", "pdf_text": sample_clinical_text}),
-            ("/api/ai/extract-tables", {"document_id": "test", "pdf_text": sample_clinical_text}),
-            ("/api/ai/analyze-image", {"document_id": "test", "image_base64": "data:image/png;base64,iVBORw0KGg", "prompt": "test"}),
-            ("/api/ai/deep-analysis", {"document_id": "test", "pdf_text": sample_clinical_text, "prompt": "test"}),
+            route.path for route in app.routes
+            if isinstance(route, APIRoute) and route.path.startswith("/api/ai/") and "POST" in route.methods
         ]
+        assert endpoints, "No /api/ai/ routes registered"
+
+        # Authentication is checked before the body is validated, so a stub payload will do
+        responses = await asyncio.gather(*(
+            _post_json(aclient, endpoint, {"document_id": "test"}) for endpoint in endpoints
+        ))
 
-        print(f"\n✓ AUTHENTICATION ENFORCEMENT:")
-        for endpoint, payload in endpoints:
-            response = client.post(endpoint, json=payload)
+        for endpoint, response in zip(endpoints, responses):
+            log.info("AUTH %s: %d", endpoint, response.status_code)
             # Backend returns 403 Forbidden (both 401 and 403 are secure)
             assert response.status_code in [401, 403], f"{endpoint} should reject without auth (got {response.status_code})"
-            print(f"  {endpoint}: ✓ Rejected ({response.status_code})")
 
 
 class TestRealLLM_RateLimiting:
-    """Test rate limiting with real LLM endpoints"""
+    """Test rate limiting on the real AI routes"""
 
-    @pytest.mark.slow
-    def test_rate_limit_enforcement(self, client, auth_headers, sample_clinical_text):
+    @pytest.fixture(autouse=True)
+    def stub_llm(self, monkeypatch):
+        """Answer without calling the LLM; the limiter runs before it is reached"""
+        monkeypatch.setattr("app.routers.ai.generate_text", lambda **kwargs: "x" * 150)
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_rate_limit_enforcement(self, aclient, auth_headers, sample_clinical_text):
         """
         Test rate limiting enforcement (10 requests/minute default)
-        WARNING: This test makes 11 real API calls and may be slow/expensive
-        """
-        print(f"\n✓ RATE LIMITING TEST (Making 11 real API calls):")
 
-        success_count = 0
-        rate_limited_count = 0
+        One request more than the limit is sent as a single burst, so all
+        land in the same window without the bucket refilling in between.
+        The LLM is stubbed, so this exercises the real routes and limiter
+        in well under a second at no API cost.
+        """
+        limit = settings.AI_RATE_LIMIT_PER_MINUTE
 
-        for i in range(11):
-            response = client.post(
+        results = await asyncio.gather(*(
+            _post_json(
+                aclient,
                 "/api/ai/generate-summary",
-                json={"document_id": f"rate-test-{i}", "pdf_text": sample_clinical_text[:500]},  # Use shorter text
-                headers=auth_headers,
-                timeout=60.0
+                {"document_id": f"rate-test-{i}", "pdf_text": sample_clinical_text},
+                headers=auth_headers
             )
+            for i in range(limit + 1)
+        ))
 
-            if response.status_code == 200:
-                success_count += 1
-                print(f"  Request {i+1}: ✓ Success (200)")
-            elif response.status_code == 429:
-                rate_limited_count += 1
-                print(f"  Request {i+1}: ✓ Rate Limited (429)")
-            else:
-                print(f"  Request {i+1}: ✗ Unexpected status {response.status_code}")
+        statuses = [result.status_code for result in results]
+        log.info("RATE LIMIT statuses for %d requests: %s", limit + 1, statuses)
 
-        # Should have ~10 successes and 1+ rate limited
-        assert success_count <= 10, f"Should enforce rate limit after 10 requests (got {success_count} successes)"
-        assert rate_limited_count >= 1, "Should have at least 1 rate-limited request"
-
-        print(f"  Total Success: {success_count}/11")
-        print(f"  Total Rate Limited: {rate_limited_count}/11")
+        assert statuses.count(200) == limit, f"Should allow exactly {limit} requests (got {statuses})"
+        assert statuses.count(429) == 1, f"Should rate-limit the request over the limit (got {statuses})"
 
 
 class TestRealLLM_ErrorRecovery:
@@ -451,17 +498,15 @@ class TestRealLLM_ErrorRecovery:
         Test that oversized requests (>1MB) are rejected before hitting LLM
         Validates input validation
         """
-        large_text = "A" * 1_100_000  # 1.1MB
-
         response = client.post(
             "/api/ai/generate-pico",
-            json={"document_id": "test-large", "pdf_text": large_text},
-            headers=auth_headers
+            content=OVERSIZED_PICO_BODY,
+            headers={**auth_headers, "Content-Type": "application/json"}
         )
 
+        log.info("OVERSIZED request: %d", response.status_code)
         assert response.status_code == 413, "Should reject oversized requests"
-        print(f"\n✓ OVERSIZED REQUEST REJECTION: Status {response.status_code}")
 
 
 if __name__ == "__main__":
-    pytest.main([__file__, "-v", "-s", "--tb=short"])
+    pytest.main([__file__, "-v", "--tb=short"])
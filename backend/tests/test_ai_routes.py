@@ -1,55 +1,30 @@
 """
 Test suite for AI proxy routes
 Tests all 7 AI endpoints with mocked Gemini/Anthropic responses
+
+Run in parallel with: pytest backend/tests/test_ai_routes.py -n auto
 """
+import asyncio
+import httpx
+import json
+import orjson
+import types
 import pytest
-from fastapi.testclient import TestClient
-from unittest.mock import Mock, patch, MagicMock
-from datetime import datetime, timedelta
+import pytest_asyncio
+import textwrap
+from unittest.mock import patch
 
 from app.main import app
-from app.models import db, User
-from app.auth import create_access_token
-
 
-@pytest.fixture
-def client():
-    """FastAPI test client"""
-    return TestClient(app)
 
+# Every test shares the module's event loop, so the client below can be module-scoped
+pytestmark = pytest.mark.asyncio(loop_scope="module")
 
-@pytest.fixture
-def test_user():
-    """Create a test user"""
-    user_id = db.generate_id()
-    user = User(
-        id=user_id,
-        email="test@example.com",
-        password_hash="hashed_password",
-        created_at=datetime.now(),
-        updated_at=datetime.now()
-    )
-    db.users[user_id] = user
-    db.users_by_email["test@example.com"] = user_id
-    yield user
-    # Cleanup
-    if user_id in db.users:
-        del db.users[user_id]
-    if "test@example.com" in db.users_by_email:
-        del db.users_by_email["test@example.com"]
-
-
-@pytest.fixture
-def auth_headers(test_user):
-    """Generate authentication headers"""
-    token = create_access_token(data={"sub": test_user.email})
-    return {"Authorization": f"Bearer {token}"}
-
+# PICO request with 1.1MB of text (over the 1MB limit), prebuilt as JSON bytes
+OVERSIZED_PICO_BODY = b'{"document_id":"test-doc","pdf_text":"' + b"A" * 1_100_000 + b'"}'
 
-@pytest.fixture
-def sample_pdf_text():
-    """Sample PDF text for testing"""
-    return """
+# Sample PDF text, dedented once so no request carries the source indentation
+SAMPLE_PDF_TEXT = textwrap.dedent("""
     Clinical Study: Cerebellar Stroke Management
 
     ABSTRACT
@@ -74,370 +49,346 @@ def sample_pdf_text():
     PMID: 12345678
     Journal: Neurosurgery
     Year: 2020
-    """
-
-
-class TestGeneratePICO:
-    """Tests for /api/ai/generate-pico endpoint"""
+    """).strip()
+
+# Canned LLM answers, serialized once at import. Minified like the raw JSON a
+# model returns with response_mime_type=application/json.
+PICO_JSON = json.dumps({
+    "population": "Patients with acute cerebellar stroke",
+    "intervention": "Decompressive craniectomy",
+    "comparator": "Conservative medical management",
+    "outcomes": "90-day mortality, mRS scores",
+    "timing": "2015-2020, 90-day follow-up",
+    "study_type": "Randomized controlled trial"
+}, separators=(",", ":"))
+
+VALIDATION_SUPPORTED_JSON = json.dumps({
+    "is_supported": True,
+    "quote": "We enrolled 150 patients with cerebellar infarction",
+    "confidence": 0.95
+}, separators=(",", ":"))
+
+VALIDATION_NOT_SUPPORTED_JSON = json.dumps({
+    "is_supported": False,
+    "quote": "No mention of 500 patients in the document",
+    "confidence": 0.98
+}, separators=(",", ":"))
+
+METADATA_JSON = json.dumps({
+    "doi": "10.1001/neurosurgery.2020.12345",
+    "pmid": "12345678",
+    "journal": "Neurosurgery",
+    "year": 2020
+}, separators=(",", ":"))
+
+METADATA_PARTIAL_JSON = json.dumps({
+    "doi": None,
+    "pmid": None,
+    "journal": "Neurosurgery",
+    "year": 2020
+}, separators=(",", ":"))
+
+TABLES_JSON = json.dumps({
+    "tables": [
+        {
+            "title": "Table 1: Baseline Characteristics",
+            "description": "Patient demographics and clinical features",
+            "data": [
+                ["Characteristic", "Surgical (n=75)", "Conservative (n=75)"],
+                ["Mean age (years)", "65±10", "67±12"],
+                ["Male (%)", "55", "52"]
+            ]
+        }
+    ]
+}, separators=(",", ":"))
+
+SUMMARY_TEXT = (
+    "This randomized controlled trial evaluated decompressive craniectomy in 150 patients "
+    "with acute cerebellar stroke. The surgical intervention significantly reduced 90-day "
+    "mortality (15% vs 35%, p<0.001) and improved functional outcomes. These findings "
+    "support early surgical intervention in this patient population."
+)
+
+IMAGE_ANALYSIS_TEXT = (
+    "This CT scan shows a large cerebellar infarction with mass effect and compression "
+    "of the fourth ventricle. There is evidence of hydrocephalus."
+)
+
+DEEP_ANALYSIS_TEXT = (
+    "This study provides strong evidence for surgical intervention in cerebellar stroke. "
+    "The 20% absolute risk reduction in mortality is clinically significant. However, the "
+    "study lacks long-term outcomes beyond 90 days and does not stratify results by "
+    "infarct size or location."
+)
+
+
+# Provider failures, built once; _FakeLLM drops the previous traceback on each raise
+_QUOTA_ERR = Exception("API quota exceeded")
+_RATE_ERR = Exception("429 rate limit exceeded")
+
+# Fields every AI request shares; read-only so no test can mutate it for the rest
+_BASE_BODY = types.MappingProxyType({"document_id": "test-doc"})
+
+
+def _post(client, path, headers, **extra):
+    """POST _BASE_BODY plus the given fields to an AI endpoint, encoded with orjson"""
+    return client.post(
+        path,
+        content=orjson.dumps({**_BASE_BODY, **extra}),
+        headers={**(headers or {}), "Content-Type": "application/json"}
+    )
 
-    @patch('app.services.llm.GeminiClient')
-    def test_generate_pico_success(self, mock_gemini, client, auth_headers, sample_pdf_text):
-        """Test successful PICO generation"""
-        # Mock Gemini response
-        mock_instance = MagicMock()
-        mock_instance.generate_text.return_value = """{
-            "population": "Patients with acute cerebellar stroke",
-            "intervention": "Decompressive craniectomy",
-            "comparator": "Conservative medical management",
-            "outcomes": "90-day mortality, mRS scores",
-            "timing": "2015-2020, 90-day follow-up",
-            "study_type": "Randomized controlled trial"
-        }"""
-        mock_gemini.return_value = mock_instance
-
-        response = client.post(
-            "/api/ai/generate-pico",
-            json={"document_id": "test-doc", "pdf_text": sample_pdf_text},
-            headers=auth_headers
-        )
 
-        assert response.status_code == 200
-        data = response.json()
-        assert "population" in data
-        assert "intervention" in data
-        assert "cerebellar stroke" in data["population"].lower()
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def client():
+    """Async client calling the app in-process, so requests can be issued concurrently"""
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as c:
+        yield c
 
-    def test_generate_pico_unauthorized(self, client, sample_pdf_text):
-        """Test PICO generation without authentication"""
-        response = client.post(
-            "/api/ai/generate-pico",
-            json={"document_id": "test-doc", "pdf_text": sample_pdf_text}
-        )
 
-        assert response.status_code == 401
+class _FakeLLM:
+    """Minimal stand-in for a GeminiClient/AnthropicClient instance; counts its calls"""
 
-    def test_generate_pico_too_large(self, client, auth_headers):
-        """Test PICO generation with text exceeding size limit"""
-        large_text = "A" * 1_100_000  # Over 1MB
+    def __init__(self, text=None, vision=None, exc=None):
+        self._text, self._vision, self._exc = text, vision, exc
+        self.calls = 0
 
-        response = client.post(
-            "/api/ai/generate-pico",
-            json={"document_id": "test-doc", "pdf_text": large_text},
-            headers=auth_headers
-        )
+    def generate_text(self, *args, **kwargs):
+        self.calls += 1
+        if self._exc:
+            raise self._exc.with_traceback(None)
+        return self._text
 
-        assert response.status_code == 413
-        assert "too large" in response.json()["detail"].lower()
+    def generate_vision(self, *args, **kwargs):
+        self.calls += 1
+        if self._exc:
+            raise self._exc.with_traceback(None)
+        return self._vision
 
 
-class TestGenerateSummary:
-    """Tests for /api/ai/generate-summary endpoint"""
+@pytest.fixture
+def mock_gemini():
+    """GeminiClient class patched for the test; set return_value to a fake instance"""
+    with patch('app.services.llm.GeminiClient', autospec=True) as mock:
+        yield mock
 
-    @patch('app.services.llm.GeminiClient')
-    def test_generate_summary_success(self, mock_gemini, client, auth_headers, sample_pdf_text):
-        """Test successful summary generation"""
-        mock_instance = MagicMock()
-        mock_instance.generate_text.return_value = """This randomized controlled trial
-        evaluated decompressive craniectomy in 150 patients with acute cerebellar stroke.
-        The surgical intervention significantly reduced 90-day mortality (15% vs 35%, p<0.001)
-        and improved functional outcomes. These findings support early surgical intervention
-        in this patient population."""
-        mock_gemini.return_value = mock_instance
-
-        response = client.post(
-            "/api/ai/generate-summary",
-            json={"document_id": "test-doc", "pdf_text": sample_pdf_text},
-            headers=auth_headers
-        )
 
-        assert response.status_code == 200
-        data = response.json()
-        assert "summary" in data
-        assert len(data["summary"]) > 100
+@pytest.fixture
+def mock_anthropic():
+    """AnthropicClient class patched for the test; set return_value to a fake instance"""
+    with patch('app.services.llm.AnthropicClient', autospec=True) as mock:
+        yield mock
 
-    def test_generate_summary_unauthorized(self, client, sample_pdf_text):
-        """Test summary generation without authentication"""
-        response = client.post(
-            "/api/ai/generate-summary",
-            json={"document_id": "test-doc", "pdf_text": sample_pdf_text}
-        )
 
-        assert response.status_code == 401
+@pytest.fixture(scope="session")
+def sample_pdf_text():
+    """Sample PDF text for testing"""
+    return SAMPLE_PDF_TEXT
+
+
+def _assert_pico(data):
+    assert "population" in data
+    assert "intervention" in data
+    assert "cerebellar stroke" in data["population"].lower()
+
+
+def _assert_summary(data):
+    assert "summary" in data
+    assert len(data["summary"]) > 100
+
+
+def _assert_validation_supported(data):
+    assert data["is_supported"] is True
+    assert data["confidence"] > 0.8
+    assert "150" in data["quote"]
+
+
+def _assert_validation_not_supported(data):
+    assert data["is_supported"] is False
+
+
+def _assert_metadata(data):
+    assert data["doi"] == "10.1001/neurosurgery.2020.12345"
+    assert data["pmid"] == "12345678"
+    assert data["year"] == 2020
+
+
+def _assert_metadata_partial(data):
+    assert data["doi"] is None
+    assert data["pmid"] is None
+    assert data["journal"] == "Neurosurgery"
+
+
+def _assert_tables(data):
+    assert "tables" in data
+    assert len(data["tables"]) > 0
+    assert "title" in data["tables"][0]
+
+
+def _assert_no_tables(data):
+    assert data["tables"] == []
+
+
+def _assert_analysis(data):
+    assert "analysis" in data
+    assert len(data["analysis"]) > 100
+
+
+def _assert_image_analysis(data):
+    assert "analysis" in data
+    assert len(data["analysis"]) > 50
+
+
+# Minimal 1x1 PNG
+IMAGE_PNG_B64 = "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg=="
+
+# (endpoint, request fields for a given pdf text, canned LLM, response validator)
+SUCCESS_CASES = [
+    pytest.param(
+        "/api/ai/generate-pico",
+        lambda text: {"pdf_text": text},
+        _FakeLLM(text=PICO_JSON), _assert_pico,
+        id="generate-pico"
+    ),
+    pytest.param(
+        "/api/ai/generate-summary",
+        lambda text: {"pdf_text": text},
+        _FakeLLM(text=SUMMARY_TEXT), _assert_summary,
+        id="generate-summary"
+    ),
+    pytest.param(
+        "/api/ai/validate-field",
+        lambda text: {"field_id": "sample_size", "field_value": "150", "pdf_text": text},
+        _FakeLLM(text=VALIDATION_SUPPORTED_JSON), _assert_validation_supported,
+        id="validate-field-supported"
+    ),
+    pytest.param(
+        "/api/ai/validate-field",
+        lambda text: {"field_id": "sample_size", "field_value": "500", "pdf_text": text},
+        _FakeLLM(text=VALIDATION_NOT_SUPPORTED_JSON), _assert_validation_not_supported,
+        id="validate-field-not-supported"
+    ),
+    pytest.param(
+        "/api/ai/find-metadata",
+        lambda text: {"pdf_text": text},
+        _FakeLLM(text=METADATA_JSON), _assert_metadata,
+        id="find-metadata"
+    ),
+    pytest.param(
+        "/api/ai/find-metadata",
+        lambda text: {"pdf_text": text},
+        _FakeLLM(text=METADATA_PARTIAL_JSON), _assert_metadata_partial,
+        id="find-metadata-partial"
+    ),
+    pytest.param(
+        "/api/ai/extract-tables",
+        lambda text: {"pdf_text": text},
+        _FakeLLM(text=TABLES_JSON), _assert_tables,
+        id="extract-tables"
+    ),
+    pytest.param(
+        "/api/ai/extract-tables",
+        lambda text: {"pdf_text": "No tables in this text."},
+        _FakeLLM(text='{"tables":[]}'), _assert_no_tables,
+        id="extract-tables-none"
+    ),
+    pytest.param(
+        "/api/ai/analyze-image",
+        lambda text: {"image_base64": IMAGE_PNG_B64, "prompt": "Describe the findings in this CT scan"},
+        _FakeLLM(vision=IMAGE_ANALYSIS_TEXT), _assert_image_analysis,
+        id="analyze-image"
+    ),
+    pytest.param(
+        "/api/ai/deep-analysis",
+        lambda text: {"pdf_text": text, "prompt": "Critically evaluate the study methodology and findings"},
+        _FakeLLM(text=DEEP_ANALYSIS_TEXT), _assert_analysis,
+        id="deep-analysis"
+    ),
+]
+
+
+class TestEndpointSuccess:
+    """Tests for successful calls to each AI endpoint with a mocked Gemini answer"""
+
+    @pytest.mark.parametrize("endpoint,payload_fn,fake_llm,validator", SUCCESS_CASES)
+    async def test_endpoint_success(self, mock_gemini, client, auth_headers, sample_pdf_text,
+                                    endpoint, payload_fn, fake_llm, validator):
+        """Call one endpoint and check the mocked answer is parsed into its response model"""
+        mock_gemini.return_value = fake_llm
+
+        response = await _post(client, endpoint, auth_headers, **payload_fn(sample_pdf_text))
+
+        assert response.status_code == 200, f"{endpoint} failed with: {response.text}"
+        validator(response.json())
 
 
-class TestValidateField:
-    """Tests for /api/ai/validate-field endpoint"""
-
-    @patch('app.services.llm.GeminiClient')
-    def test_validate_field_supported(self, mock_gemini, client, auth_headers, sample_pdf_text):
-        """Test field validation when value is supported"""
-        mock_instance = MagicMock()
-        mock_instance.generate_text.return_value = """{
-            "is_supported": true,
-            "quote": "We enrolled 150 patients with cerebellar infarction",
-            "confidence": 0.95
-        }"""
-        mock_gemini.return_value = mock_instance
-
-        response = client.post(
-            "/api/ai/validate-field",
-            json={
-                "document_id": "test-doc",
-                "field_id": "sample_size",
-                "field_value": "150",
-                "pdf_text": sample_pdf_text
-            },
-            headers=auth_headers
-        )
+class TestGeneratePICO:
+    """Tests for /api/ai/generate-pico endpoint"""
 
-        assert response.status_code == 200
-        data = response.json()
-        assert data["is_supported"] is True
-        assert data["confidence"] > 0.8
-        assert "150" in data["quote"]
-
-    @patch('app.services.llm.GeminiClient')
-    def test_validate_field_not_supported(self, mock_gemini, client, auth_headers, sample_pdf_text):
-        """Test field validation when value is not supported"""
-        mock_instance = MagicMock()
-        mock_instance.generate_text.return_value = """{
-            "is_supported": false,
-            "quote": "No mention of 500 patients in the document",
-            "confidence": 0.98
-        }"""
-        mock_gemini.return_value = mock_instance
-
-        response = client.post(
-            "/api/ai/validate-field",
-            json={
-                "document_id": "test-doc",
-                "field_id": "sample_size",
-                "field_value": "500",
-                "pdf_text": sample_pdf_text
-            },
-            headers=auth_headers
-        )
+    async def test_generate_pico_unauthorized(self, client, sample_pdf_text):
+        """Test PICO generation without authentication"""
+        response = await _post(client, "/api/ai/generate-pico", None, pdf_text=sample_pdf_text)
 
-        assert response.status_code == 200
-        data = response.json()
-        assert data["is_supported"] is False
-
-
-class TestFindMetadata:
-    """Tests for /api/ai/find-metadata endpoint"""
-
-    @patch('app.services.llm.GeminiClient')
-    def test_find_metadata_success(self, mock_gemini, client, auth_headers, sample_pdf_text):
-        """Test successful metadata extraction"""
-        mock_instance = MagicMock()
-        mock_instance.generate_text.return_value = """{
-            "doi": "10.1001/neurosurgery.2020.12345",
-            "pmid": "12345678",
-            "journal": "Neurosurgery",
-            "year": 2020
-        }"""
-        mock_gemini.return_value = mock_instance
-
-        response = client.post(
-            "/api/ai/find-metadata",
-            json={"document_id": "test-doc", "pdf_text": sample_pdf_text},
-            headers=auth_headers
-        )
+        assert response.status_code == 401
 
-        assert response.status_code == 200
-        data = response.json()
-        assert data["doi"] == "10.1001/neurosurgery.2020.12345"
-        assert data["pmid"] == "12345678"
-        assert data["year"] == 2020
-
-    @patch('app.services.llm.GeminiClient')
-    def test_find_metadata_partial(self, mock_gemini, client, auth_headers, sample_pdf_text):
-        """Test metadata extraction with missing fields"""
-        mock_instance = MagicMock()
-        mock_instance.generate_text.return_value = """{
-            "doi": null,
-            "pmid": null,
-            "journal": "Neurosurgery",
-            "year": 2020
-        }"""
-        mock_gemini.return_value = mock_instance
-
-        response = client.post(
-            "/api/ai/find-metadata",
-            json={"document_id": "test-doc", "pdf_text": sample_pdf_text},
-            headers=auth_headers
+    async def test_generate_pico_too_large(self, client, auth_headers):
+        """Test PICO generation with text exceeding size limit"""
+        response = await client.post(
+            "/api/ai/generate-pico",
+            content=OVERSIZED_PICO_BODY,
+            headers={**auth_headers, "Content-Type": "application/json"}
         )
 
-        assert response.status_code == 200
-        data = response.json()
-        assert data["doi"] is None
-        assert data["pmid"] is None
-        assert data["journal"] == "Neurosurgery"
-
-
-class TestExtractTables:
-    """Tests for /api/ai/extract-tables endpoint"""
-
-    @patch('app.services.llm.GeminiClient')
-    def test_extract_tables_success(self, mock_gemini, client, auth_headers, sample_pdf_text):
-        """Test successful table extraction"""
-        mock_instance = MagicMock()
-        mock_instance.generate_text.return_value = """{
-            "tables": [
-                {
-                    "title": "Table 1: Baseline Characteristics",
-                    "description": "Patient demographics and clinical features",
-                    "data": [
-                        ["Characteristic", "Surgical (n=75)", "Conservative (n=75)"],
-                        ["Mean age (years)", "65±10", "67±12"],
-                        ["Male (%)", "55", "52"]
-                    ]
-                }
-            ]
-        }"""
-        mock_gemini.return_value = mock_instance
-
-        response = client.post(
-            "/api/ai/extract-tables",
-            json={"document_id": "test-doc", "pdf_text": sample_pdf_text},
-            headers=auth_headers
-        )
+        assert response.status_code == 413
+        assert "too large" in response.json()["detail"].lower()
 
-        assert response.status_code == 200
-        data = response.json()
-        assert "tables" in data
-        assert len(data["tables"]) > 0
-        assert "title" in data["tables"][0]
-
-    @patch('app.services.llm.GeminiClient')
-    def test_extract_tables_no_tables(self, mock_gemini, client, auth_headers):
-        """Test table extraction with no tables found"""
-        mock_instance = MagicMock()
-        mock_instance.generate_text.return_value = '{"tables": []}'
-        mock_gemini.return_value = mock_instance
-
-        response = client.post(
-            "/api/ai/extract-tables",
-            json={"document_id": "test-doc", "pdf_text": "No tables in this text."},
-            headers=auth_headers
-        )
 
-        assert response.status_code == 200
-        data = response.json()
-        assert data["tables"] == []
-
-
-class TestAnalyzeImage:
-    """Tests for /api/ai/analyze-image endpoint"""
-
-    @patch('app.services.llm.GeminiClient')
-    def test_analyze_image_success(self, mock_gemini, client, auth_headers):
-        """Test successful image analysis"""
-        mock_instance = MagicMock()
-        mock_instance.generate_vision.return_value = """This CT scan shows a large
-        cerebellar infarction with mass effect and compression of the fourth ventricle.
-        There is evidence of hydrocephalus."""
-        mock_gemini.return_value = mock_instance
-
-        # Mock base64 image (minimal PNG)
-        image_base64 = "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg=="
-
-        response = client.post(
-            "/api/ai/analyze-image",
-            json={
-                "document_id": "test-doc",
-                "image_base64": image_base64,
-                "prompt": "Describe the findings in this CT scan"
-            },
-            headers=auth_headers
-        )
+class TestGenerateSummary:
+    """Tests for /api/ai/generate-summary endpoint"""
 
-        assert response.status_code == 200
-        data = response.json()
-        assert "analysis" in data
-        assert len(data["analysis"]) > 50
-
-
-class TestDeepAnalysis:
-    """Tests for /api/ai/deep-analysis endpoint"""
-
-    @patch('app.services.llm.GeminiClient')
-    def test_deep_analysis_success(self, mock_gemini, client, auth_headers, sample_pdf_text):
-        """Test successful deep analysis"""
-        mock_instance = MagicMock()
-        mock_instance.generate_text.return_value = """This study provides strong
-        evidence for surgical intervention in cerebellar stroke. The 20% absolute
-        risk reduction in mortality is clinically significant. However, the study
-        lacks long-term outcomes beyond 90 days and does not stratify results by
-        infarct size or location."""
-        mock_gemini.return_value = mock_instance
-
-        response = client.post(
-            "/api/ai/deep-analysis",
-            json={
-                "document_id": "test-doc",
-                "pdf_text": sample_pdf_text,
-                "prompt": "Critically evaluate the study methodology and findings"
-            },
-            headers=auth_headers
-        )
+    async def test_generate_summary_unauthorized(self, client, sample_pdf_text):
+        """Test summary generation without authentication"""
+        response = await _post(client, "/api/ai/generate-summary", None, pdf_text=sample_pdf_text)
 
-        assert response.status_code == 200
-        data = response.json()
-        assert "analysis" in data
-        assert len(data["analysis"]) > 100
+        assert response.status_code == 401
 
 
 class TestRateLimiting:
     """Tests for rate limiting on AI endpoints"""
 
-    @patch('app.services.llm.GeminiClient')
-    def test_rate_limit_enforcement(self, mock_gemini, client, auth_headers, sample_pdf_text):
+    async def test_rate_limit_enforcement(self, mock_gemini, client, auth_headers, sample_pdf_text):
         """Test that rate limiting is enforced"""
-        mock_instance = MagicMock()
-        mock_instance.generate_text.return_value = '{"summary": "Test summary"}'
-        mock_gemini.return_value = mock_instance
+        mock_gemini.return_value = _FakeLLM(text='{"summary": "Test summary"}')
 
-        # Make 11 requests (exceeds default limit of 10)
-        for i in range(11):
-            response = client.post(
-                "/api/ai/generate-summary",
-                json={"document_id": "test-doc", "pdf_text": sample_pdf_text},
-                headers=auth_headers
-            )
+        # Make 11 requests at once (exceeds default limit of 10)
+        responses = await asyncio.gather(*(
+            _post(client, "/api/ai/generate-summary", auth_headers, pdf_text=sample_pdf_text)
+            for _ in range(11)
+        ))
 
-            if i < 10:
-                assert response.status_code == 200
-            else:
-                # 11th request should be rate limited
-                assert response.status_code == 429
+        # Completion order is not deterministic, so check counts rather than positions
+        statuses = [response.status_code for response in responses]
+        assert statuses.count(200) == 10, f"First 10 requests should succeed (got {statuses})"
+        assert statuses.count(429) == 1, f"11th request should be rate limited (got {statuses})"
 
 
 class TestErrorHandling:
     """Tests for error handling in AI endpoints"""
 
-    @patch('app.services.llm.GeminiClient')
-    def test_gemini_api_error(self, mock_gemini, client, auth_headers, sample_pdf_text):
+    async def test_gemini_api_error(self, mock_gemini, client, auth_headers, sample_pdf_text):
         """Test handling of Gemini API errors"""
-        mock_instance = MagicMock()
-        mock_instance.generate_text.side_effect = Exception("API quota exceeded")
-        mock_gemini.return_value = mock_instance
-
-        response = client.post(
-            "/api/ai/generate-summary",
-            json={"document_id": "test-doc", "pdf_text": sample_pdf_text},
-            headers=auth_headers
-        )
+        mock_gemini.return_value = _FakeLLM(exc=_QUOTA_ERR)
+
+        response = await _post(client, "/api/ai/generate-summary", auth_headers, pdf_text=sample_pdf_text)
 
         assert response.status_code == 500
         assert "failed" in response.json()["detail"].lower()
 
-    def test_invalid_json_request(self, client, auth_headers):
+    async def test_invalid_json_request(self, client, auth_headers):
         """Test handling of invalid JSON in request"""
-        response = client.post(
-            "/api/ai/generate-summary",
-            json={"pdf_text": 12345},  # Invalid: should be string
-            headers=auth_headers
+        response = await _post(
+            client, "/api/ai/generate-summary", auth_headers,
+            pdf_text=12345  # Invalid: should be string
         )
 
         assert response.status_code == 422  # Validation error
@@ -446,29 +397,22 @@ class TestErrorHandling:
 class TestFallbackProvider:
     """Tests for LLM provider fallback functionality"""
 
-    @patch('app.services.llm.AnthropicClient')
-    @patch('app.services.llm.GeminiClient')
-    def test_fallback_to_anthropic(self, mock_gemini, mock_anthropic, client, auth_headers, sample_pdf_text):
+    async def test_fallback_to_anthropic(self, mock_gemini, mock_anthropic, client, auth_headers, sample_pdf_text):
         """Test fallback from Gemini to Anthropic on retryable error"""
-        # Gemini fails with retryable error
-        mock_gemini_instance = MagicMock()
-        mock_gemini_instance.generate_text.side_effect = Exception("429 rate limit exceeded")
-        mock_gemini.return_value = mock_gemini_instance
-
-        # Anthropic succeeds
-        mock_anthropic_instance = MagicMock()
-        mock_anthropic_instance.generate_text.return_value = """Test summary from Claude"""
-        mock_anthropic.return_value = mock_anthropic_instance
-
-        response = client.post(
-            "/api/ai/generate-summary",
-            json={"document_id": "test-doc", "pdf_text": sample_pdf_text},
-            headers=auth_headers
+        # Gemini fails with retryable error, Anthropic succeeds
+        gemini = mock_gemini.return_value = _FakeLLM(exc=_RATE_ERR)
+        anthropic = mock_anthropic.return_value = _FakeLLM(text="Test summary from Claude")
+
+        # Bounded so a fallback that hangs fails the test instead of stalling the run
+        response = await asyncio.wait_for(
+            _post(client, "/api/ai/generate-summary", auth_headers, pdf_text=sample_pdf_text),
+            timeout=5
         )
 
         assert response.status_code == 200
-        data = response.json()
-        assert "summary" in data
+        assert response.json()["summary"] == "Test summary from Claude"
+        assert gemini.calls == 1, "Gemini should be tried exactly once"
+        assert anthropic.calls == 1, "Anthropic should answer after the single Gemini failure"
 
 
 if __name__ == "__main__":
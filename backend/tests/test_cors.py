@@ -0,0 +1,96 @@
+"""
+Test suite for CORS origin matching
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.testclient import TestClient
+
+from app.main import REPLIT_DEV_ORIGIN_REGEX, cors_middleware_options
+
+
+class TestReplitDevOriginRegex:
+    """Tests for the Replit dev preview origin pattern"""
+
+    @pytest.mark.parametrize("origin", [
+        "https://myapp.replit.dev",
+        "https://abc123-00-xyz789.kirk.replit.dev",
+    ])
+    def test_accepts_replit_dev_origins(self, origin):
+        """HTTPS Replit dev hosts are allowed"""
+        assert REPLIT_DEV_ORIGIN_REGEX.fullmatch(origin)
+
+    @pytest.mark.parametrize("origin", [
+        "https://evil.com/x.replit.dev",
+        "https://evil.com?.replit.dev",
+        "https://replit.dev.evil.com",
+        "http://myapp.replit.dev",
+        "https://.replit.dev",
+    ])
+    def test_rejects_lookalike_origins(self, origin):
+        """Paths, suffixes and plain HTTP cannot spoof a Replit host"""
+        assert not REPLIT_DEV_ORIGIN_REGEX.fullmatch(origin)
+
+
+class TestAllowedOrigins:
+    """Tests for CORS preflight against the configured origin set"""
+
+    def test_preflight_allows_configured_origin(self, client):
+        """Local dev origin is echoed back on preflight"""
+        response = client.options(
+            "/api/pdf-library",
+            headers={"Origin": "http://localhost:5173", "Access-Control-Request-Method": "GET"}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["access-control-allow-origin"] == "http://localhost:5173"
+
+    def test_preflight_rejects_unknown_origin(self, client):
+        """Origins outside the set are not allowed"""
+        response = client.options(
+            "/api/pdf-library",
+            headers={"Origin": "https://evil.example.com", "Access-Control-Request-Method": "GET"}
+        )
+
+        assert response.status_code == 400
+        assert "access-control-allow-origin" not in response.headers
+
+
+class TestWildcardOrigins:
+    """Tests for CORS_ORIGINS=* at the middleware level"""
+
+    @pytest.fixture
+    def wildcard_client(self):
+        """Bare app with the CORS middleware configured as for CORS_ORIGINS=*"""
+        wildcard_app = FastAPI()
+        wildcard_app.add_middleware(CORSMiddleware, **cors_middleware_options("*"))
+
+        @wildcard_app.get("/ping")
+        async def ping():
+            return {}
+
+        return TestClient(wildcard_app)
+
+    def _preflight(self, client, origin):
+        return client.options("/ping", headers={"Origin": origin, "Access-Control-Request-Method": "GET"})
+
+    def test_allows_replit_dev_origin(self, wildcard_client):
+        """Replit dev previews are allowed through the regex"""
+        response = self._preflight(wildcard_client, "https://abc123-00-xyz789.kirk.replit.dev")
+
+        assert response.status_code == 200
+        assert response.headers["access-control-allow-origin"] == "https://abc123-00-xyz789.kirk.replit.dev"
+
+    def test_allows_local_dev_origin(self, wildcard_client):
+        """Local dev origins stay allowed"""
+        response = self._preflight(wildcard_client, "http://localhost:5173")
+
+        assert response.status_code == 200
+
+    @pytest.mark.parametrize("origin", ["https://evil.com/x.replit.dev", "https://evil.example.com"])
+    def test_rejects_other_origins(self, wildcard_client, origin):
+        """The wildcard does not allow arbitrary origins, since credentials are allowed"""
+        response = self._preflight(wildcard_client, origin)
+
+        assert response.status_code == 400
+        assert "access-control-allow-origin" not in response.headers
@@ -0,0 +1,182 @@
+"""
+Test suite for the Gemini File Search service
+Tests upload polling and file handling against a mocked google-genai client
+"""
+import base64
+import io
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+
+from app.services.file_search import FileSearchService
+
+PDF_BYTES = b"%PDF-1.4 file search test"
+PDF_BASE64 = "data:application/pdf;base64," + base64.b64encode(PDF_BYTES).decode("ascii")
+
+
+def _operation(done):
+    """Fake long-running operation"""
+    return Mock(done=done)
+
+
+@pytest.fixture
+def service():
+    """FileSearchService with a mocked google-genai client"""
+    svc = FileSearchService()
+    svc.client = Mock()
+    svc.client.file_search_stores.create.return_value = Mock()
+    svc.client.file_search_stores.create.return_value.name = "fileSearchStores/test-store"
+    return svc
+
+
+class TestClientInitialization:
+    """Tests for lazy google-genai client creation"""
+
+    def test_client_not_created_until_used(self):
+        """Constructing the service does not import the SDK"""
+        with patch("app.services.file_search._load_genai") as mock_load:
+            svc = FileSearchService()
+            mock_load.assert_not_called()
+
+            mock_load.return_value = False
+            assert svc.client is None
+            assert svc.client is None
+
+        mock_load.assert_called_once()
+
+    def test_client_created_once_on_first_use(self):
+        """First access builds the genai client and later accesses reuse it"""
+        mock_genai = Mock()
+        with patch("app.services.file_search._load_genai", return_value=True), \
+                patch("app.services.file_search.genai", mock_genai):
+            svc = FileSearchService()
+            assert svc.client is mock_genai.Client.return_value
+            assert svc.client is mock_genai.Client.return_value
+
+        mock_genai.Client.assert_called_once()
+
+
+class TestUploadPolling:
+    """Tests for the import-completion poll loop"""
+
+    @pytest.mark.asyncio
+    async def test_backoff_delays_grow_and_cap(self, service):
+        """Poll delay starts at 200ms, grows 1.5x and caps at 5s"""
+        service.client.file_search_stores.upload_to_file_search_store.return_value = _operation(False)
+        service.client.operations.get.side_effect = [_operation(False)] * 9 + [_operation(True)]
+
+        with patch("app.services.file_search.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            result = await service.upload_pdf_to_file_search("doc-1", PDF_BASE64, "test.pdf")
+
+        delays = [call.args[0] for call in mock_sleep.await_args_list]
+        assert delays[0] == pytest.approx(0.2)
+        for prev, cur in zip(delays, delays[1:]):
+            assert cur == pytest.approx(min(5.0, prev * 1.5))
+        assert max(delays) <= 5.0
+        assert delays[-1] == pytest.approx(5.0)
+        assert result["file_search_store_id"] == "fileSearchStores/test-store"
+        assert service.get_store_id("doc-1") == "fileSearchStores/test-store"
+
+    @pytest.mark.asyncio
+    async def test_quick_import_returns_after_first_poll(self, service):
+        """An import that finishes immediately only waits 200ms"""
+        service.client.file_search_stores.upload_to_file_search_store.return_value = _operation(False)
+        service.client.operations.get.return_value = _operation(True)
+
+        with patch("app.services.file_search.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            await service.upload_pdf_to_file_search("doc-2", PDF_BASE64, "test.pdf")
+
+        assert [call.args[0] for call in mock_sleep.await_args_list] == [pytest.approx(0.2)]
+
+    @pytest.mark.asyncio
+    async def test_timeout_after_60_seconds(self, service):
+        """Import that never completes times out once 60s of delay has elapsed"""
+        service.client.file_search_stores.upload_to_file_search_store.return_value = _operation(False)
+        service.client.operations.get.return_value = _operation(False)
+
+        with patch("app.services.file_search.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            with pytest.raises(Exception, match="timed out"):
+                await service.upload_pdf_to_file_search("doc-3", PDF_BASE64, "test.pdf")
+
+        delays = [call.args[0] for call in mock_sleep.await_args_list]
+        assert sum(delays) >= 60
+        assert sum(delays[:-1]) < 60
+        assert service.get_store_id("doc-3") is None
+
+
+class TestUploadFile:
+    """Tests for the file object handed to upload_to_file_search_store"""
+
+    @pytest.mark.asyncio
+    async def test_passes_readable_iobase_with_mime_type(self, service):
+        """SDK receives a readable IOBase at position 0 plus an explicit mime_type"""
+        received = {}
+
+        def fake_upload(file, file_search_store_name, config):
+            received["is_iobase"] = isinstance(file, io.IOBase)
+            received["position"] = file.tell()
+            received["content"] = file.read()
+            received["store"] = file_search_store_name
+            received["config"] = config
+            return _operation(True)
+
+        service.client.file_search_stores.upload_to_file_search_store.side_effect = fake_upload
+
+        await service.upload_pdf_to_file_search("doc-4", PDF_BASE64, "test.pdf")
+
+        assert received["is_iobase"] is True
+        assert received["position"] == 0
+        assert received["content"] == PDF_BYTES
+        assert received["store"] == "fileSearchStores/test-store"
+        assert received["config"] == {"display_name": "test.pdf", "mime_type": "application/pdf"}
+
+
+class TestQueryCitations:
+    """Tests for citation parsing from grounding metadata"""
+
+    async def _query(self, service, response):
+        service.client.models.generate_content.return_value = response
+        # google-genai types are unavailable when the SDK is not installed
+        with patch("app.services.file_search.types"):
+            return await service.query_with_citations("doc-5", "fileSearchStores/test-store", "What?")
+
+    @pytest.mark.asyncio
+    async def test_extracts_text_and_page_numbers(self, service):
+        """Citations carry segment text and the first chunk's page number"""
+        metadata = SimpleNamespace(
+            grounding_supports=[
+                SimpleNamespace(segment=SimpleNamespace(text="first"), grounding_chunk_indices=[1]),
+                SimpleNamespace(segment=SimpleNamespace(text="second"), grounding_chunk_indices=[5]),
+                SimpleNamespace(segment=SimpleNamespace(text=None), grounding_chunk_indices=None),
+            ],
+            grounding_chunks=[SimpleNamespace(page_number=1), SimpleNamespace(page_number=3)]
+        )
+        response = SimpleNamespace(text="Answer", candidates=[SimpleNamespace(grounding_metadata=metadata)])
+
+        result = await self._query(service, response)
+
+        assert result["answer"] == "Answer"
+        assert [(c["text"], c["page_number"]) for c in result["citations"]] == [
+            ("first", 3), ("second", None), ("", None)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_skips_supports_without_segment(self, service):
+        """Supports with no segment are not cited"""
+        metadata = SimpleNamespace(grounding_supports=[SimpleNamespace(grounding_chunk_indices=[0])])
+        response = SimpleNamespace(text="Answer", candidates=[SimpleNamespace(grounding_metadata=metadata)])
+
+        result = await self._query(service, response)
+
+        assert result["citations"] == []
+
+    @pytest.mark.asyncio
+    async def test_no_grounding_metadata(self, service):
+        """Responses without candidates or metadata have no citations"""
+        for response in (
+            SimpleNamespace(text="Answer", candidates=None),
+            SimpleNamespace(text="Answer", candidates=[SimpleNamespace(grounding_metadata=None)]),
+            SimpleNamespace(text=None),
+        ):
+            result = await self._query(service, response)
+            assert result["citations"] == []
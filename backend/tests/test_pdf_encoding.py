@@ -0,0 +1,95 @@
+"""
+Test suite for PDF base64 encoding helpers
+"""
+import base64
+import os
+import pytest
+from unittest.mock import patch
+
+from app.pdf_encoding import (
+    ENCODE_CHUNK_SIZE, PDF_DATA_URI_PREFIX, decode_pdf_base64, encode_pdf_data_uri, preload_pdf
+)
+
+PREFIX = PDF_DATA_URI_PREFIX.decode("ascii")
+
+
+def _data_uri(data: bytes) -> str:
+    return PREFIX + base64.b64encode(data).decode("ascii")
+
+
+class TestEncodePDFDataURI:
+    """Tests for encode_pdf_data_uri"""
+
+    @pytest.mark.parametrize("size", [
+        0, 1, 2, 3,
+        ENCODE_CHUNK_SIZE - 1,
+        ENCODE_CHUNK_SIZE,
+        ENCODE_CHUNK_SIZE + 1,
+        ENCODE_CHUNK_SIZE * 2 + 2,
+    ])
+    def test_matches_one_shot_encoding(self, tmp_path, size):
+        """Chunked encoding matches encoding the whole file at once"""
+        data = bytes(i % 251 for i in range(size))
+        pdf_path = tmp_path / "doc.pdf"
+        pdf_path.write_bytes(data)
+
+        assert encode_pdf_data_uri(pdf_path) == _data_uri(data)
+
+    def test_empty_file(self, tmp_path):
+        """Empty file encodes to the bare prefix"""
+        pdf_path = tmp_path / "empty.pdf"
+        pdf_path.write_bytes(b"")
+
+        assert encode_pdf_data_uri(pdf_path) == PREFIX
+
+
+class TestDecodePDFBase64:
+    """Tests for decode_pdf_base64"""
+
+    def test_with_prefix(self):
+        """Data URI prefix is stripped before decoding"""
+        assert decode_pdf_base64(_data_uri(b"%PDF-1.4 body")) == b"%PDF-1.4 body"
+
+    def test_without_prefix(self):
+        """Bare base64 payload is decoded as-is"""
+        assert decode_pdf_base64(base64.b64encode(b"%PDF-1.4 body").decode("ascii")) == b"%PDF-1.4 body"
+
+    def test_prefix_with_empty_payload(self):
+        """Data URI with no payload decodes to empty bytes"""
+        assert decode_pdf_base64(PREFIX) == b""
+
+    def test_empty_input(self):
+        """Empty string decodes to empty bytes"""
+        assert decode_pdf_base64("") == b""
+
+    def test_round_trip_large_file(self, tmp_path):
+        """Encoding then decoding a multi-chunk file is lossless"""
+        data = bytes(i % 256 for i in range(ENCODE_CHUNK_SIZE * 3 + 7))
+        pdf_path = tmp_path / "large.pdf"
+        pdf_path.write_bytes(data)
+
+        assert decode_pdf_base64(encode_pdf_data_uri(pdf_path)) == data
+
+
+class TestPreloadPDF:
+    """Tests for preload_pdf"""
+
+    @pytest.mark.skipif(not hasattr(os, "posix_fadvise"), reason="posix_fadvise not available")
+    def test_advises_willneed(self, tmp_path):
+        """Whole file is advised as WILLNEED"""
+        pdf_path = tmp_path / "doc.pdf"
+        pdf_path.write_bytes(b"%PDF-1.4")
+
+        with patch("app.pdf_encoding.os.posix_fadvise") as mock_fadvise:
+            preload_pdf(pdf_path)
+
+        fd, offset, length, advice = mock_fadvise.call_args.args
+        assert (offset, length, advice) == (0, 0, os.POSIX_FADV_WILLNEED)
+
+    def test_noop_without_posix_fadvise(self, tmp_path):
+        """Platforms without posix_fadvise skip the hint"""
+        with patch("app.pdf_encoding.os") as mock_os:
+            del mock_os.posix_fadvise
+            preload_pdf(tmp_path / "missing.pdf")
+
+        mock_os.open.assert_not_called()
@@ -0,0 +1,330 @@
+"""
+Test suite for PDF library routes
+Tests listing and loading of bundled and uploaded library PDFs
+"""
+import base64
+import pytest
+from pydantic import ValidationError
+from datetime import datetime
+from pathlib import Path
+
+from app.models import db, User, PDFLibraryItem
+from app.auth import create_access_token
+from app.pdf_encoding import pdf_bytes_etag, pdf_file_etag
+
+SAMPLE_PDF_PATH = Path(__file__).parent.parent.parent / "public" / "Kim2016.pdf"
+
+
+@pytest.fixture
+def test_user():
+    """Create a test user"""
+    user_id = db.generate_id()
+    user = User(
+        id=user_id,
+        email="library_test@example.com",
+        password_hash="hashed_password",
+        created_at=datetime.now(),
+        updated_at=datetime.now()
+    )
+    db.users[user_id] = user
+    db.users_by_email["library_test@example.com"] = user_id
+    yield user
+    # Cleanup
+    if user_id in db.users:
+        del db.users[user_id]
+    if "library_test@example.com" in db.users_by_email:
+        del db.users_by_email["library_test@example.com"]
+
+
+@pytest.fixture
+def auth_headers(test_user):
+    """Generate authentication headers"""
+    token = create_access_token(data={"sub": test_user.email})
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def uploaded_ids(client, auth_headers):
+    """Collect IDs of uploaded library PDFs and delete them after the test"""
+    ids = []
+    yield ids
+    # Cleanup through the API so the cached listing is invalidated too
+    for library_id in ids:
+        client.delete(f"/api/pdf-library/{library_id}", headers=auth_headers)
+
+
+class TestListLibrary:
+    """Tests for GET /api/pdf-library"""
+
+    def test_list_includes_bundled_pdf(self, client, auth_headers):
+        """Bundled sample PDF is listed without PDF data"""
+        response = client.get("/api/pdf-library", headers=auth_headers)
+
+        assert response.status_code == 200
+        items = {item["id"]: item for item in response.json()}
+        assert "sample_kim2016" in items
+        assert "pdf_data" not in items["sample_kim2016"]
+        assert items["sample_kim2016"] == {
+            "id": "sample_kim2016",
+            "title": db.pdf_library["sample_kim2016"].title,
+            "filename": "Kim2016.pdf",
+            "total_pages": 9,
+            "description": db.pdf_library["sample_kim2016"].description
+        }
+        assert response.headers["content-type"] == "application/json"
+
+    def test_list_reflects_upload_and_delete(self, client, auth_headers, uploaded_ids):
+        """Cached listing is refreshed after the library changes"""
+        client.get("/api/pdf-library", headers=auth_headers)
+
+        upload = client.post(
+            "/api/pdf-library/upload",
+            files={"file": ("listed.pdf", b"%PDF-1.4 listed", "application/pdf")},
+            data={"title": "Listed", "total_pages": "1"},
+            headers=auth_headers
+        )
+        library_id = upload.json()["id"]
+        uploaded_ids.append(library_id)
+
+        listed = client.get("/api/pdf-library", headers=auth_headers).json()
+        assert library_id in {item["id"] for item in listed}
+
+        client.delete(f"/api/pdf-library/{library_id}", headers=auth_headers)
+
+        listed = client.get("/api/pdf-library", headers=auth_headers).json()
+        assert library_id not in {item["id"] for item in listed}
+
+
+class TestGetLibraryPDF:
+    """Tests for GET /api/pdf-library/{library_id}"""
+
+    def test_bundled_pdf_is_encoded_on_demand(self, client, auth_headers):
+        """Bundled PDF is not held in memory until requested"""
+        assert db.pdf_library["sample_kim2016"].pdf_bytes is None
+
+        response = client.get("/api/pdf-library/sample_kim2016", headers=auth_headers)
+
+        assert response.status_code == 200
+        expected = base64.b64encode(SAMPLE_PDF_PATH.read_bytes()).decode("ascii")
+        assert response.json()["pdf_data"] == f"data:application/pdf;base64,{expected}"
+
+    def test_uploaded_pdf_is_encoded_on_demand(self, client, auth_headers, uploaded_ids):
+        """Uploaded PDF is stored as raw bytes and served as a data URI"""
+        pdf_bytes = b"%PDF-1.4 data uri"
+        upload = client.post(
+            "/api/pdf-library/upload",
+            files={"file": ("data-uri.pdf", pdf_bytes, "application/pdf")},
+            data={"title": "Data URI", "total_pages": "1"},
+            headers=auth_headers
+        )
+        library_id = upload.json()["id"]
+        uploaded_ids.append(library_id)
+        assert db.pdf_library[library_id].pdf_bytes == pdf_bytes
+
+        response = client.get(f"/api/pdf-library/{library_id}", headers=auth_headers)
+
+        assert response.status_code == 200
+        expected = base64.b64encode(pdf_bytes).decode("ascii")
+        assert response.json()["pdf_data"] == f"data:application/pdf;base64,{expected}"
+
+    def test_missing_pdf(self, client, auth_headers):
+        """Unknown library ID returns 404"""
+        response = client.get("/api/pdf-library/does-not-exist", headers=auth_headers)
+
+        assert response.status_code == 404
+
+
+class TestUploadLibraryPDF:
+    """Tests for POST /api/pdf-library/upload"""
+
+    def test_upload_pdf(self, client, auth_headers, uploaded_ids):
+        """Multipart PDF upload is added to the library"""
+        response = client.post(
+            "/api/pdf-library/upload",
+            files={"file": ("new.pdf", b"%PDF-1.7 body", "application/pdf")},
+            data={"title": "New PDF", "total_pages": "3", "description": "Test upload"},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        uploaded_ids.append(data["id"])
+        assert data["filename"] == "new.pdf"
+        assert data["total_pages"] == 3
+        assert data["description"] == "Test upload"
+
+    def test_upload_rejects_non_pdf(self, client, auth_headers):
+        """Files without a PDF header are rejected"""
+        response = client.post(
+            "/api/pdf-library/upload",
+            files={"file": ("notes.txt", b"plain text", "text/plain")},
+            data={"title": "Not a PDF", "total_pages": "1"},
+            headers=auth_headers
+        )
+
+        assert response.status_code == 400
+
+
+class TestGetLibraryPDFRaw:
+    """Tests for GET /api/pdf-library/{library_id}/raw"""
+
+    def test_bundled_pdf_served_as_binary(self, client, auth_headers):
+        """Bundled PDF is streamed from disk as application/pdf"""
+        response = client.get("/api/pdf-library/sample_kim2016/raw", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/pdf"
+        assert response.content == SAMPLE_PDF_PATH.read_bytes()
+
+    def test_uploaded_pdf_served_as_binary(self, client, auth_headers, uploaded_ids):
+        """Uploaded PDF round-trips through the library as binary"""
+        pdf_bytes = b"%PDF-1.4 test document"
+        upload = client.post(
+            "/api/pdf-library/upload",
+            files={"file": ("uploaded.pdf", pdf_bytes, "application/pdf")},
+            data={"title": "Uploaded", "total_pages": "1"},
+            headers=auth_headers
+        )
+        library_id = upload.json()["id"]
+        uploaded_ids.append(library_id)
+
+        response = client.get(f"/api/pdf-library/{library_id}/raw", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.content == pdf_bytes
+
+    def test_missing_pdf(self, client, auth_headers):
+        """Unknown library ID returns 404"""
+        response = client.get("/api/pdf-library/does-not-exist/raw", headers=auth_headers)
+
+        assert response.status_code == 404
+
+
+class TestConditionalGet:
+    """Tests for ETag / If-None-Match handling on library PDFs"""
+
+    @pytest.mark.parametrize("path", [
+        "/api/pdf-library/sample_kim2016",
+        "/api/pdf-library/sample_kim2016/raw",
+    ])
+    def test_etag_and_cache_control(self, client, auth_headers, path):
+        """Library PDFs carry an ETag and a private Cache-Control"""
+        response = client.get(path, headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.headers["etag"] == f'"{db.pdf_library["sample_kim2016"].etag}"'
+        assert response.headers["cache-control"] == "private, max-age=3600"
+
+    @pytest.mark.parametrize("path", [
+        "/api/pdf-library/sample_kim2016",
+        "/api/pdf-library/sample_kim2016/raw",
+    ])
+    def test_matching_if_none_match_returns_304(self, client, auth_headers, path):
+        """Revalidating with the current ETag returns 304 with no body"""
+        etag = client.get(path, headers=auth_headers).headers["etag"]
+
+        response = client.get(path, headers={**auth_headers, "If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_weak_and_listed_etags_match(self, client, auth_headers):
+        """Weak validators and ETag lists are compared weakly"""
+        etag = client.get("/api/pdf-library/sample_kim2016/raw", headers=auth_headers).headers["etag"]
+
+        response = client.get(
+            "/api/pdf-library/sample_kim2016/raw",
+            headers={**auth_headers, "If-None-Match": f'"other", W/{etag}'}
+        )
+
+        assert response.status_code == 304
+
+    def test_stale_etag_returns_full_response(self, client, auth_headers):
+        """A non-matching ETag gets the full PDF"""
+        response = client.get(
+            "/api/pdf-library/sample_kim2016/raw",
+            headers={**auth_headers, "If-None-Match": '"stale"'}
+        )
+
+        assert response.status_code == 200
+        assert response.content == SAMPLE_PDF_PATH.read_bytes()
+
+    def test_uploaded_pdf_etag_is_content_hash(self, client, auth_headers, uploaded_ids):
+        """Uploaded PDFs are tagged by content and revalidate to 304"""
+        upload = client.post(
+            "/api/pdf-library/upload",
+            files={"file": ("etag.pdf", b"%PDF-1.4 etag", "application/pdf")},
+            data={"title": "ETag", "total_pages": "1"},
+            headers=auth_headers
+        )
+        library_id = upload.json()["id"]
+        uploaded_ids.append(library_id)
+
+        response = client.get(f"/api/pdf-library/{library_id}/raw", headers=auth_headers)
+        etag = response.headers["etag"]
+        assert etag == f'"{pdf_bytes_etag(b"%PDF-1.4 etag")}"'
+
+        response = client.get(
+            f"/api/pdf-library/{library_id}/raw",
+            headers={**auth_headers, "If-None-Match": etag}
+        )
+        assert response.status_code == 304
+
+    def test_replaced_bundled_pdf_gets_new_etag(self, client, auth_headers, tmp_path, monkeypatch):
+        """A bundled file changed on disk is re-tagged and re-encoded, not served stale"""
+        pdf_path = tmp_path / "bundled.pdf"
+        pdf_path.write_bytes(b"%PDF-1.4 original")
+        item = PDFLibraryItem(
+            id="bundled_tmp", title="Bundled", filename="bundled.pdf", total_pages=1,
+            pdf_path=str(pdf_path), etag=pdf_file_etag(pdf_path), created_at=datetime.now()
+        )
+        monkeypatch.setitem(db.pdf_library, item.id, item)
+
+        old_etag = client.get("/api/pdf-library/bundled_tmp", headers=auth_headers).headers["etag"]
+        pdf_path.write_bytes(b"%PDF-1.4 replaced with new content")
+
+        raw = client.get("/api/pdf-library/bundled_tmp/raw", headers={**auth_headers, "If-None-Match": old_etag})
+        assert raw.status_code == 200
+        assert raw.headers["etag"] != old_etag
+        assert raw.content == b"%PDF-1.4 replaced with new content"
+
+        detail = client.get("/api/pdf-library/bundled_tmp", headers=auth_headers)
+        expected = base64.b64encode(b"%PDF-1.4 replaced with new content").decode("ascii")
+        assert detail.json()["pdf_data"] == f"data:application/pdf;base64,{expected}"
+
+
+class TestPDFLibraryItem:
+    """Tests for the PDFLibraryItem model"""
+
+    def _item(self, **kwargs):
+        return PDFLibraryItem(
+            id="item", title="Item", filename="item.pdf",
+            total_pages=1, created_at=datetime.now(), **kwargs
+        )
+
+    def test_requires_a_pdf_source(self):
+        """Neither pdf_bytes nor pdf_path is rejected"""
+        with pytest.raises(ValidationError):
+            self._item()
+
+    def test_rejects_both_pdf_sources(self):
+        """Both pdf_bytes and pdf_path is rejected"""
+        with pytest.raises(ValidationError):
+            self._item(pdf_bytes=b"%PDF-", pdf_path="/tmp/item.pdf")
+
+    def test_is_frozen(self):
+        """Library items cannot be mutated in place"""
+        item = self._item(pdf_path="/tmp/item.pdf")
+        with pytest.raises(ValidationError):
+            item.title = "Changed"
+
+    def test_rejects_unknown_fields(self):
+        """Unknown fields are rejected"""
+        with pytest.raises(ValidationError):
+            self._item(pdf_path="/tmp/item.pdf", extra_field="x")
+
+    def test_accepts_single_pdf_source(self):
+        """Either source on its own is accepted"""
+        assert self._item(pdf_path="/tmp/item.pdf").pdf_bytes is None
+        assert self._item(pdf_bytes=b"%PDF-").pdf_path is None
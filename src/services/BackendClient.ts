@@ -420,8 +420,26 @@ class BackendClient {
     }
   }
 
+  /**
+   * Get specific PDF from library as a binary file
+   */
+  async getLibraryPDFFile(libraryId: string): Promise<Blob> {
+    const response = await this.authenticatedRequest(`/api/pdf-library/${libraryId}/raw`, {
+      method: 'GET',
+      headers: { 'Accept': 'application/pdf' },
+    });
+
+    if (!response.ok) {
+      const error = await response.json();
+      throw new Error(error.detail || 'Failed to fetch library PDF');
+    }
+
+    return await response.blob();
+  }
+
   /**
    * Get specific PDF from library with data
+   * @deprecated Returns a base64 data URI; use getLibraryPDFFile instead
    */
   async getLibraryPDF(libraryId: string): Promise<any> {
     const response = await this.authenticatedRequest(`/api/pdf-library/${libraryId}`, {
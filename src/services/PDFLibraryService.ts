@@ -15,6 +15,9 @@ interface LibraryPDF {
   description?: string;
 }
 
+// Library metadata from the last dropdown refresh, keyed by library ID
+const libraryItems = new Map<string, LibraryPDF>();
+
 const PDFLibraryService = {
   /**
    * Populate the PDF library dropdown
@@ -42,7 +45,9 @@ const PDFLibraryService = {
       }
       
       // Add library PDFs
+      libraryItems.clear();
       pdfs.forEach(pdf => {
+        libraryItems.set(pdf.id, pdf);
         const option = document.createElement('option');
         option.value = pdf.id;
         option.textContent = `${pdf.title} (${pdf.total_pages} pages)`;
@@ -71,18 +76,11 @@ const PDFLibraryService = {
     try {
       StatusManager.show('Loading PDF from library...', 'info');
       
-      // Get the full PDF data
-      const pdfItem = await BackendClient.getLibraryPDF(libraryId);
-      
-      // Convert base64 to blob
-      const base64Data = pdfItem.pdf_data.split(',')[1];
-      const binaryData = atob(base64Data);
-      const bytes = new Uint8Array(binaryData.length);
-      for (let i = 0; i < binaryData.length; i++) {
-        bytes[i] = binaryData.charCodeAt(i);
-      }
-      const blob = new Blob([bytes], { type: 'application/pdf' });
-      const file = new File([blob], pdfItem.filename, { type: 'application/pdf' });
+      // Fetch the PDF as binary (no base64 round-trip)
+      const pdfItem = libraryItems.get(libraryId);
+      const blob = await BackendClient.getLibraryPDFFile(libraryId);
+      const filename = pdfItem?.filename ?? `${libraryId}.pdf`;
+      const file = new File([blob], filename, { type: 'application/pdf' });
       
       // Store library PDF ID in state
       const AppStateManager = (window as any).ClinicalExtractor?.AppStateManager;
@@ -99,7 +97,7 @@ const PDFLibraryService = {
         AnnotationService.loadFromStorage(libraryId);
       }
       
-      StatusManager.show(`Loaded: ${pdfItem.title}`, 'success');
+      StatusManager.show(`Loaded: ${pdfItem?.title ?? filename}`, 'success');
     } catch (error) {
       console.error('Failed to load PDF from library:', error);
       StatusManager.show('Failed to load PDF from library', 'error');